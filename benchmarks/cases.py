@@ -0,0 +1,116 @@
+"""
+Benchmark cases for the PyForth interpreter.
+
+Each case is a function taking a fresh Interpreter and returning the 
+callable to be timed. Setup work done in the case itself is not timed.
+"""
+
+from __future__ import annotations
+
+from typing import Callable
+
+from pyforth.runtime import Interpreter
+
+# pylint: disable="invalid-name"
+# pylint: disable="missing-function-docstring"
+
+CASES:dict[str, Callable[[Interpreter], Callable[[], None]]] = {}
+
+
+def case(name:str):
+    """register a benchmark case"""
+    def register(f):
+        CASES[name] = f
+        return f
+    return register
+
+
+def _run(engine:Interpreter, cli:str)->Callable[[], None]:
+    """time the interpretation of cli, starting from an empty stack"""
+    def run():
+        engine.stack.clear()
+        engine.interpret(cli)
+        if engine.lastError is not None:
+            raise RuntimeError(engine.lastError)
+    return run
+
+
+# parsing and compiling
+
+@case("parse")
+def parse(engine):
+    line = " ".join(["DUP", "123", "SWAP", '"a string"', "4.5", "OVER"] * 2000)
+
+    def run():
+        engine.CLI = line
+        engine.CliIdx = 0
+        while engine.nextWord() is not None:
+            pass
+    return run
+
+
+@case("compile")
+def compileWords(engine):
+    src = " ".join(": bench_{0} 1 2 + DUP 0 5 DO I + LOOP IF 3 ELSE 4 ENDIF ;".format(n)
+                   for n in range(200))
+    return _run(engine, src)
+
+
+# inner interpreter
+
+@case("fibIter")
+def fibIter(engine):
+    engine.interpret(": fibIter 0 1 ROT 0 SWAP DO OVER + SWAP LOOP DROP ;")
+    return _run(engine, "5000 fibIter")
+
+
+@case("nested-do-loop")
+def nestedLoop(engine):
+    engine.interpret(": nested 0 0 100 DO 0 100 DO I J + + LOOP LOOP ;")
+    return _run(engine, "nested")
+
+
+@case("begin-until")
+def beginUntil(engine):
+    engine.interpret(": countdown BEGIN 1 - DUP 0 = UNTIL ;")
+    return _run(engine, "20000 countdown")
+
+
+# memory
+
+@case("store-fetch")
+def storeFetch(engine):
+    engine.interpret(": storefetch 0 5000 DO I I ! I @ DROP LOOP ;")
+    return _run(engine, "storefetch")
+
+
+@case("fill")
+def fill(engine):
+    return _run(engine, "0 20000 0 FILL")
+
+
+@case("move")
+def move(engine):
+    engine.interpret("0 20000 1 FILL")
+    return _run(engine, "0 20000 20000 MOVE 20000 0 20000 MOVE")
+
+
+# arrays
+
+@case("array-build")
+def arrayBuild(engine):
+    src = "[ " + " ".join(str(n) for n in range(5000)) + " ]"
+    return _run(engine, src)
+
+
+@case("map")
+def arrayMap(engine):
+    engine.interpret(": double 2 * ;")
+    src = "[ " + " ".join(str(n) for n in range(2000)) + " ] ' double MAP"
+    return _run(engine, src)
+
+
+@case("pack")
+def arrayPack(engine):
+    engine.interpret(": packing 0 2000 DO I LOOP 2000 PACK ;")
+    return _run(engine, "packing")
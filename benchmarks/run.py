@@ -0,0 +1,104 @@
+"""
+Run the interpreter benchmarks and compare them with a stored baseline.
+
+    python benchmarks/run.py                 compare all cases with the baseline
+    python benchmarks/run.py --save          store the results as the new baseline
+    python benchmarks/run.py fibIter map     run selected cases
+    python benchmarks/run.py --mode native   run compiled words as python functions
+
+A case slower than the baseline by more than --threshold (relative, default 0.1)
+is flagged as a regression and the exit status is 1.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from pyforth.runtime import Interpreter  # noqa: E402
+from cases import CASES  # noqa: E402
+
+# pylint: disable="invalid-name"
+# pylint: disable="consider-using-f-string"
+
+MODES = {
+    "interpreted": {},
+    "threaded": {"threaded": True},
+    "native": {"native": True},
+}
+
+
+def measure(name:str, mode:str, repeat:int)->float:
+    """return the fastest time of one run of a case in seconds"""
+    run = CASES[name](Interpreter(**MODES[mode]))
+    timer = timeit.Timer(run)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def compare(results:dict, baseline:dict, threshold:float)->list[str]:
+    """print results against the baseline, return the regressed cases"""
+    regressions = []
+    print("{:<16} {:>12} {:>12} {:>8}".format("case", "seconds", "baseline", "change"))
+    for name, seconds in results.items():
+        before = baseline.get(name)
+        if before is None:
+            print("{:<16} {:>12.6f} {:>12} {:>8}".format(name, seconds, "-", "-"))
+            continue
+        change = seconds / before - 1
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print("{:<16} {:>12.6f} {:>12.6f} {:>+7.1%}{}".format(name, seconds, before, change, flag))
+    return regressions
+
+
+def main(argv=None)->int:
+    parser = argparse.ArgumentParser(description="PyForth interpreter benchmarks")
+    parser.add_argument("cases", nargs="*", help="cases to run, default all")
+    parser.add_argument("--save", action="store_true")
+    parser.add_argument("--baseline")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    parser.add_argument("--mode", choices=MODES, default="interpreted")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    names = args.cases or list(CASES)
+    unknown = [name for name in names if name not in CASES]
+    if unknown:
+        parser.error("unknown cases: {}".format(", ".join(unknown)))
+    path = Path(args.baseline or Path(__file__).parent / "baseline-{}.json".format(args.mode))
+
+    results = {name: measure(name, args.mode, args.repeat) for name in names}
+
+    baseline = {}
+    if path.exists():
+        baseline = json.loads(path.read_text(encoding="utf-8"))["results"]
+    regressions = compare(results, baseline, args.threshold)
+
+    if args.save:
+        data = {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "mode": args.mode,
+            "results": {**baseline, **results},
+        }
+        path.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
+        print("saved baseline to {}".format(path))
+        return 0
+    if regressions:
+        print("regressions: {}".format(", ".join(regressions)))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
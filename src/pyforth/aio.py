@@ -0,0 +1,180 @@
+"""
+===========
+PyForth Aio
+===========
+Run an interpreter inside an asyncio event loop.
+
+An AsyncInterpreter wraps an Interpreter. interpret_async runs compiled words
+as a Task, `budget` words at a time, and gives the event loop a turn in
+between, so a long evaluation does not stall the other coroutines.
+
+    forth = AsyncInterpreter(readLine=session.receive)
+    await forth.interpret_async("10000 BUSY")
+    await forth.load_async("app.forth")
+
+Words with an async implementation in meta["async"] await it instead of
+blocking when run by an AsyncInterpreter:
+
+    EXPECT     reads a line with the readLine of the AsyncInterpreter
+    MS         sleeps with asyncio.sleep
+    READ-TEXT  reads the file in a worker thread
+
+Run by Interpreter.interpret they block as before. Words run by EXECUTE,
+MAP or LOAD inside a compiled word run to completion, as they do in a task.
+PAUSE and JOIN give the event loop a turn as well as the tasks started by
+SPAWN.
+
+An AsyncInterpreter runs one command line at a time; concurrent calls wait
+for each other.
+
+@author: stephanmeyn
+"""
+
+from __future__ import annotations
+
+import asyncio
+import weakref
+from typing import Awaitable, Callable
+
+from pyforth.runtime import CompiledCode, CompiledPrimitive, Interpreter, MethodABC, vocabulary
+from pyforth.tasks import TASK_BUDGET, Task
+
+# pylint: disable="invalid-name"
+# pylint: disable="unused-argument"
+
+_frontEnds:weakref.WeakKeyDictionary[Interpreter, AsyncInterpreter] = weakref.WeakKeyDictionary()
+
+
+async def readConsole(prompt:str)->str:
+    """read a line from the console without blocking the event loop"""
+    return await asyncio.to_thread(input, prompt)
+
+
+class AsyncInterpreter():
+    """an interpreter cooperating with the asyncio event loop"""
+
+    def __init__(self, engine:Interpreter|None=None, budget:int=TASK_BUDGET,
+                 readLine:Callable[[str], Awaitable[str]]|None=None):
+        """
+        :param engine: the interpreter, a new one if None
+        :param budget: words run between two turns of the event loop
+        :param readLine: coroutine function reading a line for EXPECT, given the prompt
+        """
+        self.engine = engine if engine is not None else Interpreter()
+        self.budget = budget
+        self.readLine = readLine if readLine is not None else readConsole
+        self._lock = asyncio.Lock()
+        _frontEnds[self.engine] = self
+
+    async def interpret_async(self, cli:str)->None:
+        """interpret a string, see Interpreter.interpret"""
+        async with self._lock:
+            await self._interpret(cli)
+
+    async def load_async(self, path:str)->None:
+        """interpret a file, read in a worker thread"""
+        text = await asyncio.to_thread(_readText, path)
+        await self.interpret_async(text)
+
+    async def run_async(self)->None:
+        """run the interpreter on lines read with readLine, like Interpreter.run"""
+        while True:
+            await self.interpret_async(await self.readLine("> "))
+
+    async def _interpret(self, cli:str):
+        engine = self.engine
+        engine.pushInput(cli)
+        try:
+            for method in engine.interpretSteps():
+                try:
+                    await self._execute(method)
+                except Exception as ex:  # pylint: disable=broad-except
+                    engine.executeFailed(method, ex)
+                    break
+        finally:
+            engine.popInput()
+            if not engine.inputStack:
+                engine.output.flush()
+
+    async def _execute(self, method:MethodABC):
+        engine = self.engine
+        if isinstance(method, CompiledPrimitive):
+            if "async" in method.meta:
+                await method.meta["async"](engine, None)
+                return
+            if method is _PAUSE:
+                await self._turn()
+                return
+            if method is _JOIN:
+                while not engine.stack[-1].done:
+                    await self._turn()
+        if isinstance(method, CompiledCode) and engine.trace is None and not engine.profiling:
+            await self._runTask(method)
+        else:
+            engine.execute(method, None)
+
+    async def _runTask(self, method:CompiledCode):
+        """run method on the stacks of the interpreter, giving the event loop
+        a turn every budget words"""
+        engine = self.engine
+        task = Task(engine, method, 0)
+        task.stack, task.rp = engine.stack, engine.rp
+        task.allowAwait = True
+        try:
+            while True:
+                task.step(self.budget)
+                if task.awaiting is not None:
+                    awaiting, task.awaiting = task.awaiting, None
+                    with task.installed():
+                        await awaiting
+                    continue
+                if task.done:
+                    break
+                await self._turn()
+        finally:
+            engine.stack, engine.rp = task.stack, task.rp
+        if task.error is not None:
+            raise task.error
+
+    async def _turn(self):
+        """give the event loop and the tasks of the interpreter a turn"""
+        await asyncio.sleep(0)
+        if self.engine.scheduler is not None:
+            self.engine.scheduler.runRound()
+
+
+def _readText(path:str)->str:
+    with open(path, "r", encoding="utf-8") as fd:
+        return fd.read()
+
+
+async def expectAsync(engine:Interpreter, caller):
+    """EXPECT reading with the readLine of the front end"""
+    frontEnd = _frontEnds.get(engine)
+    readLine = frontEnd.readLine if frontEnd is not None else readConsole
+    engine.output.flush()
+    engine.push(str(await readLine(">")))
+
+
+async def sleepMsAsync(engine:Interpreter, caller):
+    """MS sleeping without blocking the event loop"""
+    await asyncio.sleep(engine.pop() / 1000)
+
+
+async def readTextAsync(engine:Interpreter, caller):
+    """READ-TEXT reading the file in a worker thread"""
+    path = engine.pop()
+    engine.push(await asyncio.to_thread(_readText, path))
+
+
+def _register():
+    # words.py defines the blocking versions
+    import pyforth.words  # noqa: F401  pylint: disable=import-outside-toplevel,unused-import
+    vocabulary["EXPECT"].meta["async"] = expectAsync
+    vocabulary["MS"].meta["async"] = sleepMsAsync
+    vocabulary["READ-TEXT"].meta["async"] = readTextAsync
+
+
+_register()
+_PAUSE = vocabulary["PAUSE"]
+_JOIN = vocabulary["JOIN"]
@@ -0,0 +1,307 @@
+"""
+=======================
+PyForth Code Generation
+=======================
+Translate a completed CompiledCode into a python function.
+
+The body is split into basic blocks at branch targets. Inside a block the
+stack is kept in local variables wherever the stack effect of a word is known,
+and only written back to the engine stack at the end of the block. Blocks are
+selected by a program counter, so any branch pattern compiled by IF, ELSE,
+BEGIN, WHILE, UNTIL, REPEAT, DO, LOOP, +LOOP and LEAVE can be translated.
+
+Words without a known stack effect are called as they are, after the locals
+have been written back to the stack.
+
+@author: stephanmeyn
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+from typing import Callable, Optional
+
+from pyforth.optimizer import BRANCHING, takesOperand
+from pyforth.runtime import BranchTarget, CompiledCode, CompiledConstant, CompiledPrimitive, vocabulary
+
+# pylint: disable="invalid-name"
+# pylint: disable="logging-format-interpolation"
+# pylint: disable="consider-using-f-string"
+
+# words with a known stack effect: name -> (inputs, outputs, statement)
+# inputs are {0}.. with {0} the deepest, outputs are {o0}.. in push order.
+# Each statement mirrors the python implementation of the primitive.
+STACK_EFFECTS = {
+    "+": (2, 1, "{o0} = {0} + {1}"),
+    "-": (2, 1, "{o0} = {0} - {1}"),
+    "*": (2, 1, "{o0} = {1} * {0}"),
+    "/": (2, 1, "{o0} = {0} / {1}"),
+    "*/": (3, 1, "{o0} = divmod({0} * {1}, {2})[0]"),
+    "MOD": (2, 1, "{o0} = {0} % {1}"),
+    "/MOD": (2, 2, "{o1}, {o0} = divmod({0}, {1})"),
+    "*/MOD": (3, 2, "{o1}, {o0} = divmod({0} * {1}, {2})"),
+    "MIN": (2, 1, "{o0} = min({0}, {1})"),
+    "MAX": (2, 1, "{o0} = max({0}, {1})"),
+    "ABS": (1, 1, "{o0} = abs({0})"),
+    "MINUS": (1, 1, "{o0} = -{0}"),
+    "1+": (1, 1, "{o0} = {0} + 1"),
+    "2+": (1, 1, "{o0} = {0} + 2"),
+    "AND": (2, 1, "{o0} = {1} & {0}"),
+    "OR": (2, 1, "{o0} = {1} | {0}"),
+    "XOR": (2, 1, "{o0} = {1} ^ {0}"),
+    "0<": (1, 1, "{o0} = {0} < 0"),
+    "0=": (1, 1, "{o0} = {0} == 0"),
+    "<": (2, 1, "{o0} = {0} < {1}"),
+    ">": (2, 1, "{o0} = {0} > {1}"),
+    "=": (2, 1, "{o0} = {0} == {1}"),
+    ">=": (2, 1, "{o0} = {0} >= {1}"),
+    "<=": (2, 1, "{o0} = {0} <= {1}"),
+    "!": (2, 0, "engine.mem[{1}] = {0}"),
+    "@": (1, 1, "{o0} = engine.mem[{0}]"),
+    "+!": (2, 0, "engine.mem[{1}] += {0}"),
+    ">R": (1, 0, "_r.append({0})"),
+    "R>": (0, 1, "{o0} = _r.pop()"),
+    "R": (0, 1, "{o0} = _r[-1]"),
+    "I": (0, 1, "{o0} = _r[-1]"),
+    "J": (0, 1, "{o0} = _r[-3]"),
+    "(DO)": (0, 1, "{o0} = 0 if _r[-1] >= _r[-2] else 1"),
+    "(>R>R)": (2, 0, "_r.append({1})\n_r.append({0})"),
+    "UNLOOP": (0, 0, "_r.pop()\n_r.pop()"),
+    "(OVER+)": (2, 2, "{o0} = {0}\n{o1} = {1} + {0}"),
+}
+
+# words taking the constant following them as operand {c}
+OPERAND_EFFECTS = {
+    "LIT+": (1, 1, "{o0} = {0} + {c}"),
+}
+
+# pure stack shuffles: name -> (inputs, order of the outputs)
+SHUFFLES = {
+    "DUP": (1, (0, 0)),
+    "NIP": (2, (1,)),
+    "DROP": (1, ()),
+    "SWAP": (2, (1, 0)),
+    "OVER": (2, (0, 1, 0)),
+    "ROT": (3, (1, 2, 0)),
+}
+
+
+def _isCore(method, name:str)->bool:
+    """true if method is the core primitive called name"""
+    return type(method) is CompiledPrimitive and method.name == name \
+        and vocabulary.get(name) is method
+
+
+class _Block():
+    """generates the statements of one basic block"""
+
+    def __init__(self, generator:_Generator):
+        self.gen = generator
+        self.lines:list[str] = []
+        self.stack:list[str] = []  # expressions not yet on the engine stack
+
+    def emit(self, line:str):
+        self.lines.extend(line.split("\n"))
+
+    def pop(self)->str:
+        if self.stack:
+            return self.stack.pop()
+        temp = self.gen.temp()
+        self.emit("{} = _s.pop()".format(temp))
+        return temp
+
+    def popN(self, count:int)->list[str]:
+        """pop count items, return them deepest first"""
+        items = [self.pop() for _ in range(count)]
+        items.reverse()
+        return items
+
+    def flush(self):
+        """write all pending locals to the engine stack"""
+        if len(self.stack) == 1:
+            self.emit("_s.append({})".format(self.stack[0]))
+        elif self.stack:
+            self.emit("_s.extend(({},))".format(", ".join(self.stack)))
+        self.stack = []
+
+    def goto(self, target:int):
+        self.flush()
+        self.emit("_pc = {}".format(target))
+
+
+class _Generator():
+    """translate one CompiledCode"""
+
+    def __init__(self, method:CompiledCode):
+        self.method = method
+        self.code = method.code
+        self.namespace:dict = {}
+        self.nrTemps = 0
+
+    def temp(self)->str:
+        self.nrTemps += 1
+        return "_t{}".format(self.nrTemps)
+
+    def bind(self, value, prefix:str)->str:
+        """make value available to the generated code as a global"""
+        name = "{}{}".format(prefix, len(self.namespace))
+        self.namespace[name] = value
+        return name
+
+    def literal(self, value)->str:
+        if type(value) in (int, str, bool) or value is None:
+            return repr(value)
+        if type(value) is float and math.isfinite(value):
+            return repr(value)
+        return self.bind(value, "_k")
+
+    def branchTargets(self)->dict[int, int]|None:
+        """map the index of each branching word to its absolute target.
+        Return None if the targets cannot be resolved"""
+        targets = {}
+        operands = set()
+        idx = 0
+        while idx < len(self.code):
+            method = self.code[idx]
+            if takesOperand(method):
+                if idx + 1 >= len(self.code):
+                    return None
+                operand = self.code[idx + 1]
+                if not isinstance(operand, CompiledConstant):
+                    return None
+                operands.add(idx + 1)
+                if method.name in BRANCHING:
+                    if type(operand) is not BranchTarget:
+                        return None
+                    targets[idx] = operand.target
+                idx += 2
+            else:
+                idx += 1
+        for target in targets.values():
+            if target < 0 or target > len(self.code) or target in operands:
+                return None
+        return targets
+
+    def generate(self)->str|None:
+        """return the python source of the function or None"""
+        targets = self.branchTargets()
+        if targets is None:
+            return None
+        end = len(self.code)
+        leaders = {0, end}
+        leaders.update(targets.values())
+        leaders.update(idx + 2 for idx in targets)
+
+        body = []
+        idx = 0
+        while idx < end:
+            start = idx
+            block = _Block(self)
+            while True:
+                method = self.code[idx]
+                if idx in targets:
+                    self.branch(block, method.name, targets[idx], idx + 2)
+                    idx += 2
+                    break
+                if not self.step(block, idx):
+                    return None
+                idx += 2 if takesOperand(method) else 1
+                if idx in leaders:
+                    block.goto(idx)
+                    break
+            body.append("        if _pc == {}:".format(start))
+            body.extend("            " + line for line in block.lines)
+
+        lines = [
+            "def forthWord(engine, caller):",
+            "    _s = engine.stack",
+            "    _r = engine.rp",
+            "    _pc = 0",
+            "    while True:",
+        ]
+        lines.extend(body)
+        lines.append("        if _pc >= {}:".format(end))
+        lines.append("            return")
+        return "\n".join(lines) + "\n"
+
+    def branch(self, block:_Block, name:str, target:int, following:int):
+        """generate the code of a branching word"""
+        if name == "(DO)0BRANCH":
+            block.flush()
+            block.emit("if _r[-1] >= _r[-2]:")
+            block.emit("    _pc = {}".format(target))
+            block.emit("else:")
+            block.emit("    _pc = {}".format(following))
+            return
+        if name == "0BRANCH":
+            flag = block.pop()
+            block.flush()
+            block.emit("if {0} == 0 or not {0}:".format(flag))
+            block.emit("    _pc = {}".format(target))
+            block.emit("else:")
+            block.emit("    _pc = {}".format(following))
+            return
+        if name == "(LOOP)":
+            block.emit("_r[-1] += 1")
+        elif name == "(+LOOP)":
+            block.emit("_r[-1] += {}".format(block.pop()))
+        block.goto(target)
+
+    def effect(self, block:_Block, nrIn:int, nrOut:int, statement:str, **kwargs):
+        """generate a statement with a known stack effect"""
+        items = block.popN(nrIn)
+        outputs = {"o{}".format(pos): self.temp() for pos in range(nrOut)}
+        block.emit(statement.format(*items, **outputs, **kwargs))
+        block.stack.extend(outputs["o{}".format(pos)] for pos in range(nrOut))
+
+    def step(self, block:_Block, idx:int)->bool:
+        """generate the code of the non branching word at idx.
+        Return False if it cannot be translated"""
+        method = self.code[idx]
+        if type(method) is CompiledConstant:
+            block.stack.append(self.literal(method.constantValue))
+            return True
+        name = method.name
+        if takesOperand(method):
+            if name not in OPERAND_EFFECTS or not _isCore(method, name):
+                return False
+            nrIn, nrOut, statement = OPERAND_EFFECTS[name]
+            operand = self.code[idx + 1].constantValue
+            self.effect(block, nrIn, nrOut, statement, c=self.literal(operand))
+            return True
+        if name in SHUFFLES and _isCore(method, name):
+            nrIn, order = SHUFFLES[name]
+            items = block.popN(nrIn)
+            block.stack.extend(items[pos] for pos in order)
+            return True
+        if name in STACK_EFFECTS and _isCore(method, name):
+            self.effect(block, *STACK_EFFECTS[name])
+            return True
+        block.flush()
+        if type(method) is CompiledPrimitive:
+            block.emit("{}(engine, caller)".format(self.bind(method.func, "_p")))
+        elif isinstance(method, CompiledCode):
+            block.emit("engine.execute({}, caller)".format(self.bind(method, "_w")))
+        else:
+            return False
+        # the word may have replaced the stacks
+        block.emit("_s = engine.stack")
+        block.emit("_r = engine.rp")
+        return True
+
+
+def translate(method:CompiledCode)->Optional[Callable]:
+    """translate a compiled word into a python function (engine, caller).
+    Return None if the word cannot be translated."""
+    generator = _Generator(method)
+    source = generator.generate()
+    if source is None:
+        logging.info("cannot translate word '%s'", method.name)
+        return None
+    namespace = generator.namespace
+    exec(compile(source, "<forth {}>".format(method.name), "exec"), namespace)
+    function = namespace["forthWord"]
+    function.__qualname__ = function.__name__ = str(method.name)
+    method.meta["python"] = source
+    return function
@@ -21,4 +21,9 @@ class ExecutionError    (PyForthError):
     def __init__(self, expression, message):
         self.expression = expression
         self.message = message
-        pass
\ No newline at end of file
+        pass
+class ImageError(PyForthError):
+    """an image cannot be saved or loaded"""
+    def __init__(self, expression, message):
+        self.expression = expression
+        self.message = message
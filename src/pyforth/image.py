@@ -0,0 +1,127 @@
+"""
+=============
+PyForth Image
+=============
+Save the state of an interpreter to a file and restore it, instead of
+loading and compiling the forth source again.
+
+An image holds the vocabularies with the compiled words, the search order
+and the RAM. Core primitives are stored by name and resolved against the
+primitives of the loading process, so an image only stays valid as long as
+those primitives exist.
+
+@author: stephanmeyn
+"""
+
+from __future__ import annotations
+
+import io
+import pickle
+from typing import TYPE_CHECKING
+
+from pyforth.exceptions import ImageError
+from pyforth.runtime import CompiledCode, CompiledConstant, CompiledPrimitive, vocabulary
+
+if TYPE_CHECKING:
+    from pyforth.runtime import Interpreter
+
+# pylint: disable="invalid-name"
+# pylint: disable="consider-using-f-string"
+
+MAGIC = b"PYFORTH-IMAGE\x01"
+
+
+class _Pickler(pickle.Pickler):
+    """stores core primitives by name"""
+
+    def persistent_id(self, obj):
+        if type(obj) is CompiledPrimitive:
+            if vocabulary.get(obj.name) is not obj:
+                raise ImageError(obj.name, "primitive is not in the core vocabulary")
+            return obj.name
+        return None
+
+
+class _Unpickler(pickle.Unpickler):
+    """resolves core primitives by name"""
+
+    def persistent_load(self, pid):
+        method = vocabulary.get(pid)
+        if type(method) is not CompiledPrimitive:
+            raise ImageError(pid, "primitive is not in the core vocabulary")
+        return method
+
+
+def _userWords(voc:dict)->dict:
+    """the words of a vocabulary that are not core primitives"""
+    return {name: method for name, method in voc.items() if type(method) is not CompiledPrimitive}
+
+
+def _compiledWords(vocabularies:dict):
+    """yield every CompiledCode reachable from the vocabularies"""
+    seen = set()
+    pending = [method for voc in vocabularies.values() for method in voc.values()]
+    while pending:
+        method = pending.pop()
+        if isinstance(method, CompiledConstant):
+            method = method.constantValue  # e.g. a word ticked while compiling
+        if isinstance(method, CompiledCode) and id(method) not in seen:
+            seen.add(id(method))
+            yield method
+            pending.extend(method.code)
+
+
+def addWords(engine:Interpreter, vocabularies:dict)->None:
+    """add unpickled words to the vocabularies of engine and
+    build the threaded and native forms of the compiled words"""
+    for name, words in vocabularies.items():
+        engine.vocabularies.setdefault(name, {}).update(words)
+    for method in _compiledWords(vocabularies):
+        method.thread()
+        if engine.native:
+            engine.compileNative(method)
+
+
+def dumps(engine:Interpreter)->bytes:
+    """return the image of an interpreter"""
+    state = {
+        "vocabularies": {name: _userWords(voc) for name, voc in engine.vocabularies.items()},
+        "context": engine.context,
+        "definitions": engine.definitions,
+        "mem": engine.mem,
+    }
+    buffer = io.BytesIO()
+    buffer.write(MAGIC)
+    try:
+        _Pickler(buffer, protocol=pickle.HIGHEST_PROTOCOL).dump(state)
+    except (pickle.PicklingError, TypeError, AttributeError) as ex:
+        raise ImageError(None, "cannot save image: {}".format(ex)) from ex
+    return buffer.getvalue()
+
+
+def loads(engine:Interpreter, data:bytes)->None:
+    """restore the state of an interpreter from an image.
+    Words in the image replace words of the same name"""
+    if not data.startswith(MAGIC):
+        raise ImageError(None, "not a pyforth image")
+    buffer = io.BytesIO(data)
+    buffer.seek(len(MAGIC))
+    state = _Unpickler(buffer).load()
+    addWords(engine, state["vocabularies"])
+    engine.context = state["context"]
+    engine.definitions = state["definitions"]
+    engine.mem = state["mem"]
+    engine.vocabularyChanged()
+
+
+def save(engine:Interpreter, path:str)->None:
+    """write the image of an interpreter to a file"""
+    data = dumps(engine)
+    with open(path, "wb") as fd:
+        fd.write(data)
+
+
+def load(engine:Interpreter, path:str)->None:
+    """restore the state of an interpreter from an image file"""
+    with open(path, "rb") as fd:
+        loads(engine, fd.read())
@@ -0,0 +1,149 @@
+"""
+======================
+PyForth Lazy Sequences
+======================
+Words building pipelines over sequences that are only evaluated when they
+are consumed, so a pipeline over a large file runs in constant memory.
+
+    "data.txt" LINES ' PARSE-RECORD LMAP ' VALID? FILTER 10 TAKE COLLECT
+
+RANGE, LINES, LMAP, FILTER and TAKE return a LazySeq without evaluating
+anything. REDUCE and COLLECT consume it, as do MAP, LEN and UNPACK.
+A LazySeq can be consumed more than once; each time it is evaluated again.
+
+The words run by LMAP and FILTER get the item on an empty stack.
+
+@author: stephanmeyn
+"""
+
+from __future__ import annotations
+
+from itertools import islice
+from typing import Any, Callable, Iterator
+
+from pyforth.primitives import forthprim
+
+# pylint: disable="invalid-name"
+# pylint: disable="unused-argument"
+
+
+class LazySeq():
+    """a sequence evaluated when it is iterated"""
+
+    def __init__(self, produce:Callable[[], Iterator], description:str="lazy"):
+        """
+        :param produce: returns a new iterator over the items
+        """
+        self.produce = produce
+        self.description = description
+
+    def __iter__(self)->Iterator:
+        return iter(self.produce())
+
+    def __str__(self):
+        return "LazySeq({})".format(self.description)
+
+
+def force(value:Any)->Any:
+    """a LazySeq as list, anything else as it is"""
+    if isinstance(value, LazySeq):
+        return list(value)
+    return value
+
+
+def _apply(engine, method, *items)->list:
+    """run method with items on an empty stack, return what it leaves"""
+    saved = engine.stack
+    engine.stack = list(items)
+    try:
+        engine.execute(method, None)
+        return engine.stack
+    finally:
+        engine.stack = saved
+
+
+def _lines(path:str)->Iterator[str]:
+    with open(path, "r", encoding="utf-8") as fd:
+        for line in fd:
+            yield line.rstrip("\n")
+
+
+@forthprim("RANGE")
+def lazyRange(engine, caller):
+    """lazy sequence of the numbers from start up to, not including, stop
+    ( start stop -> seq )
+    """
+    stop = engine.pop()
+    start = engine.pop()
+    engine.push(LazySeq(lambda: iter(range(start, stop)), "RANGE {} {}".format(start, stop)))
+
+
+@forthprim("LINES")
+def lazyLines(engine, caller):
+    """lazy sequence of the lines of a text file, without line ends
+    ( path -> seq )
+    """
+    path = engine.pop()
+    engine.push(LazySeq(lambda: _lines(path), "LINES {}".format(path)))
+
+
+@forthprim("LMAP")
+def lazyMap(engine, caller):
+    """lazy sequence of the values forthWord leaves for each item
+    ( seq forthWord -> seq )
+    """
+    method = engine.pop()
+    seq = engine.pop()
+
+    def produce():
+        for item in seq:
+            yield from _apply(engine, method, item)
+    engine.push(LazySeq(produce, "LMAP {}".format(method.name)))
+
+
+@forthprim("FILTER")
+def lazyFilter(engine, caller):
+    """lazy sequence of the items for which forthWord leaves a true flag
+    ( seq forthWord -> seq )
+    """
+    method = engine.pop()
+    seq = engine.pop()
+
+    def produce():
+        for item in seq:
+            result = _apply(engine, method, item)
+            if result and result[-1]:
+                yield item
+    engine.push(LazySeq(produce, "FILTER {}".format(method.name)))
+
+
+@forthprim("TAKE")
+def lazyTake(engine, caller):
+    """lazy sequence of the first n items
+    ( seq n -> seq )
+    """
+    n = engine.pop()
+    seq = engine.pop()
+    engine.push(LazySeq(lambda: islice(seq, n), "TAKE {}".format(n)))
+
+
+@forthprim("REDUCE")
+def lazyReduce(engine, caller):
+    """combine the items with forthWord ( acc item -> acc ), starting with init
+    ( seq init forthWord -> acc )
+    """
+    method = engine.pop()
+    acc = engine.pop()
+    seq = engine.pop()
+    for item in seq:
+        result = _apply(engine, method, acc, item)
+        acc = result[-1] if result else None
+    engine.push(acc)
+
+
+@forthprim("COLLECT")
+def lazyCollect(engine, caller):
+    """evaluate a sequence into an array
+    ( seq -> arr )
+    """
+    engine.push(list(engine.pop()))
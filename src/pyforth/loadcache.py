@@ -0,0 +1,222 @@
+"""
+==================
+PyForth Load Cache
+==================
+Cache the words compiled by LOAD on disk.
+
+The cache key is the hash of the file content together with a fingerprint of
+the vocabularies the file is compiled against. On a hit the words defined by
+the file are restored from the cache instead of interpreting the file.
+An entry also records the hashes of the files loaded by the file in turn,
+and is not used once one of them changed.
+
+Only loads that just define words are cached: if loading leaves the stack
+or the RAM changed, prints something, or fails, the file is interpreted
+again next time. The files a cached load loaded in turn count as loaded
+when it is restored, so REQUIRE skips them.
+
+Enable the cache by setting `Interpreter.loadCache` to a directory.
+
+@author: stephanmeyn
+"""
+
+from __future__ import annotations
+
+import codecs
+import hashlib
+import io
+import logging
+import os
+import pickle
+from typing import TYPE_CHECKING, Iterator
+
+from pyforth import image
+from pyforth.runtime import READ_CHUNK, CompiledCode, CompiledPrimitive
+
+if TYPE_CHECKING:
+    from pyforth.runtime import Interpreter
+
+# pylint: disable="invalid-name"
+# pylint: disable="consider-using-f-string"
+# pylint: disable="protected-access"
+
+SUFFIX = ".fcache"
+
+
+def fingerprint(engine:Interpreter)->bytes:
+    """hash of the vocabularies and search order of engine"""
+    digest = hashlib.sha256()
+    digest.update("{}|{}".format(engine.context, engine.definitions).encode())
+    for vocName, voc in engine.vocabularies.items():
+        digest.update("\n{}:".format(vocName).encode())
+        for name in sorted(voc, key=str):
+            method = voc[name]
+            if type(method) is CompiledPrimitive:
+                digest.update("\n{}".format(name).encode())
+            elif isinstance(method, CompiledCode):
+                digest.update("\n{}={}".format(name, method.showCode()).encode())
+            else:
+                digest.update("\n{}={}".format(name, method).encode())
+    return digest.digest()
+
+
+class _Pickler(image._Pickler):
+    """stores words that existed before the load by vocabulary and name"""
+
+    def __init__(self, file, existing:dict[int, tuple[str, str]]):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.existing = existing
+
+    def persistent_id(self, obj):
+        ref = self.existing.get(id(obj))
+        if ref is not None:
+            return ref
+        return super().persistent_id(obj)
+
+
+class _Unpickler(image._Unpickler):
+    """resolves words that existed before the load"""
+
+    def __init__(self, file, engine:Interpreter):
+        super().__init__(file)
+        self.engine = engine
+
+    def persistent_load(self, pid):
+        if type(pid) is tuple:
+            vocName, name = pid
+            return self.engine.vocabularies[vocName][name]
+        return super().persistent_load(pid)
+
+
+def fileDigest(path:str)->str:
+    """sha256 of the content of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fd:
+        chunk = fd.read(READ_CHUNK)
+        while chunk:
+            digest.update(chunk)
+            chunk = fd.read(READ_CHUNK)
+    return digest.hexdigest()
+
+
+def _hashedText(fd, digest)->Iterator[str]:
+    """the text of a binary utf-8 file in chunks, with universal newlines.
+    The bytes read are added to digest"""
+    decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder("utf-8")(), translate=True)
+    chunk = fd.read(READ_CHUNK)
+    while chunk:
+        digest.update(chunk)
+        yield decoder.decode(chunk)
+        chunk = fd.read(READ_CHUNK)
+    yield decoder.decode(b"", final=True)
+
+
+class LoadCache():
+    """a directory of cached loads"""
+
+    def __init__(self, directory:str):
+        self.directory = directory
+
+    def path(self, key:str)->str:
+        return os.path.join(self.directory, key + SUFFIX)
+
+    def key(self, engine:Interpreter, sourceDigest:str)->str:
+        """the cache key of loading the source with sourceDigest into engine"""
+        digest = hashlib.sha256(sourceDigest.encode())
+        digest.update(fingerprint(engine))
+        return digest.hexdigest()
+
+    def load(self, engine:Interpreter, path:str)->bool:
+        """load a forth file into engine.
+        :return: True if the words were restored from the cache"""
+        realPath = os.path.realpath(path)
+        sourceDigest = fileDigest(path)
+        key = self.key(engine, sourceDigest)
+        outer = engine.filesRead
+        files = self.restore(engine, key)
+        restored = files is not None
+        if restored:
+            logging.info("restored '%s' from the load cache", path)
+        else:
+            files = self._interpret(engine, path, key, sourceDigest)
+        if outer is not None:
+            outer[realPath] = sourceDigest
+            outer.update(files)
+        return restored
+
+    def _interpret(self, engine:Interpreter, path:str, key:str, sourceDigest:str)->dict[str, str]:
+        """interpret the file and cache the words it defined if that is all it did.
+        :return: the hashes of the files loaded on the way by real path"""
+        stack = list(engine.stack)
+        mem = engine.mem
+        memVersion = mem.version
+        error = engine.lastError
+        written = engine.output.written
+        before = {vocName: dict(voc) for vocName, voc in engine.vocabularies.items()}
+        outer, engine.filesRead = engine.filesRead, {}
+        digest = hashlib.sha256()
+        try:
+            with open(path, "rb") as fd:
+                engine.readChunks(_hashedText(fd, digest))
+            files = engine.filesRead
+        finally:
+            engine.filesRead = outer
+        if digest.hexdigest() == sourceDigest and engine.lastError is error \
+                and engine.output.written == written and engine.stack == stack \
+                and engine.mem is mem and mem.version == memVersion:
+            self.store(engine, key, before, files)
+        return files
+
+    def restore(self, engine:Interpreter, key:str)->dict[str, str]|None:
+        """add the words of a cached load to engine.
+        :return: the hashes of the files the load loaded by real path,
+           None if the load is not cached or one of them changed"""
+        try:
+            with open(self.path(key), "rb") as fd:
+                state = _Unpickler(fd, engine).load()
+        except FileNotFoundError:
+            return None
+        except Exception:  # pylint: disable=broad-except
+            logging.exception("cannot read load cache entry %s", key)
+            return None
+        files = state["files"]
+        for path, digest in files.items():
+            try:
+                if fileDigest(path) != digest:
+                    return None
+            except OSError:
+                return None
+        image.addWords(engine, state["vocabularies"])
+        engine.context = state["context"]
+        engine.definitions = state["definitions"]
+        engine.loadedFiles.update(files)
+        engine.vocabularyChanged()
+        return files
+
+    def store(self, engine:Interpreter, key:str, before:dict, files:dict[str, str]):
+        """write the words engine gained since before and the hashes
+        of the files loaded on the way to the cache"""
+        existing = {}
+        for vocName, voc in before.items():
+            for name, method in voc.items():
+                if engine.vocabularies.get(vocName, {}).get(name) is method:
+                    existing[id(method)] = (vocName, name)
+        added = {}
+        for vocName, voc in engine.vocabularies.items():
+            words = {name: method for name, method in voc.items()
+                     if before.get(vocName, {}).get(name) is not method}
+            if words or vocName not in before:
+                added[vocName] = words
+        state = {"vocabularies": added, "context": engine.context, "definitions": engine.definitions,
+                 "files": files}
+        buffer = io.BytesIO()
+        try:
+            _Pickler(buffer, existing).dump(state)
+        except Exception:  # pylint: disable=broad-except
+            logging.info("cannot cache load %s", key, exc_info=True)
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        temp = "{}.{}.tmp".format(self.path(key), os.getpid())
+        with open(temp, "wb") as fd:
+            fd.write(buffer.getvalue())
+        os.replace(temp, self.path(key))
@@ -0,0 +1,199 @@
+"""
+=================
+PyForth Optimizer
+=================
+Peephole optimization of compiled word bodies.
+
+The compiler emits naive sequences, e.g. `>R >R` at every DO and
+`R> R> DROP DROP` after every LOOP. This pass replaces known sequences with
+fused words (superinstructions) and removes sequences without effect.
+Branch distances are resolved into absolute BranchTarget operands afterwards.
+
+@author: stephanmeyn
+"""
+
+from __future__ import annotations
+
+import logging
+
+from pyforth.exceptions import CompilationError
+from pyforth.runtime import BranchTarget, CompiledCode, CompiledConstant, CompiledPrimitive, vocabulary
+
+# pylint: disable="invalid-name"
+# pylint: disable="logging-format-interpolation"
+# pylint: disable="consider-using-f-string"
+
+# words followed by a branch operand. While compiling it is a constant holding
+# the relative branch distance, in a completed word it is a BranchTarget
+BRANCHING = ("BRANCH", "0BRANCH", "(LOOP)", "(+LOOP)", "(LEAVE)", "(DO)0BRANCH")
+
+# words followed by a constant operand they consume
+OPERAND_WORDS = ("LIT+",)
+
+LITERAL = "#"  # pattern element matching a constant
+
+# sequence to replace -> replacement.
+# The replacement takes the operand of a LITERAL or branching word in the sequence.
+PATTERNS = [
+    ((">R", ">R"), ("(>R>R)",)),
+    (("R>", "R>", "DROP", "DROP"), ("UNLOOP",)),
+    (("(DO)", "0BRANCH"), ("(DO)0BRANCH",)),
+    ((LITERAL, "+"), ("LIT+",)),
+    (("SWAP", "DROP"), ("NIP",)),
+    (("OVER", "+"), ("(OVER+)",)),
+    (("SWAP", "SWAP"), ()),
+    (("DUP", "DROP"), ()),
+]
+
+_END = "END"  # branch target past the last instruction
+
+
+class _Instruction():
+    """a word and its operand"""
+
+    def __init__(self, method, operand=None):
+        self.method = method
+        self.operand = operand  # CompiledConstant or None
+        self.target:_Instruction|str|None = None  # for branching words
+
+    @property
+    def name(self)->str|None:
+        if type(self.method) is CompiledConstant:
+            return LITERAL
+        if type(self.method) is CompiledPrimitive and vocabulary.get(self.method.name) is self.method:
+            return self.method.name
+        return None  # anything else never matches a pattern
+
+
+def takesOperand(method)->bool:
+    """true if the method is a core word followed by an operand"""
+    return type(method) is CompiledPrimitive and method.name in BRANCHING + OPERAND_WORDS
+
+
+def _decode(code:list)->list[_Instruction]|None:
+    """split the code into instructions and resolve branch targets.
+    Return None if a branch target cannot be resolved."""
+    instructions = []
+    atIndex = {}
+    targets = {}
+    idx = 0
+    while idx < len(code):
+        method = code[idx]
+        ins = _Instruction(method)
+        atIndex[idx] = ins
+        instructions.append(ins)
+        if takesOperand(method):
+            if idx + 1 >= len(code) or not isinstance(code[idx + 1], CompiledConstant):
+                return None
+            ins.operand = code[idx + 1]
+            if method.name in BRANCHING:
+                if type(ins.operand) is BranchTarget:
+                    targets[ins] = ins.operand.target
+                elif type(ins.operand.constantValue) is int:
+                    targets[ins] = idx + 1 + ins.operand.constantValue
+                else:
+                    return None
+            idx += 2
+        else:
+            idx += 1
+    atIndex[len(code)] = _END
+    for ins, target in targets.items():
+        if target not in atIndex:
+            return None
+        ins.target = atIndex[target]
+    return instructions
+
+
+def _encode(instructions:list[_Instruction], forward:dict)->list:
+    """turn instructions back into code, resolving branch targets"""
+
+    def resolve(ins):
+        while ins in forward:
+            ins = forward[ins]
+        return ins
+
+    index = {}
+    idx = 0
+    for ins in instructions:
+        index[ins] = idx
+        idx += 1 if ins.operand is None and ins.target is None else 2
+    index[_END] = idx
+
+    code = []
+    for ins in instructions:
+        code.append(ins.method)
+        if ins.target is not None:
+            code.append(BranchTarget(index[resolve(ins.target)]))
+        elif ins.operand is not None:
+            code.append(ins.operand)
+    return code
+
+
+def _peephole(instructions:list[_Instruction], forward:dict)->tuple[list[_Instruction], bool]:
+    """one pass over the instructions. Return the new list and whether it changed"""
+    targeted = set()
+    for ins in instructions:
+        if ins.target is not None:
+            target = ins.target
+            while target in forward:
+                target = forward[target]
+            targeted.add(target)
+
+    result = []
+    changed = False
+    idx = 0
+    while idx < len(instructions):
+        for sequence, replacement in PATTERNS:
+            window = instructions[idx: idx + len(sequence)]
+            if tuple(ins.name for ins in window) != sequence:
+                continue
+            if any(ins in targeted for ins in window[1:]):
+                continue  # cannot fuse across a branch target
+            following = instructions[idx + len(sequence)] \
+                if idx + len(sequence) < len(instructions) else _END
+            fused = [_Instruction(vocabulary[name]) for name in replacement]
+            for ins in window:
+                if ins.target is not None:
+                    fused[0].target = ins.target
+                elif ins.name == LITERAL:
+                    fused[0].operand = ins.method
+            forward[window[0]] = fused[0] if fused else following
+            result.extend(fused)
+            idx += len(sequence)
+            changed = True
+            break
+        else:
+            result.append(instructions[idx])
+            idx += 1
+    return result, changed
+
+
+def _decodeMethod(method:CompiledCode)->list[_Instruction]:
+    instructions = _decode(method.code)
+    if instructions is None:
+        raise CompilationError(method.name, "cannot resolve the branch targets")
+    return instructions
+
+
+def resolveBranches(method:CompiledCode)->None:
+    """replace the branch distances in the code of method by BranchTargets"""
+    method.code = _encode(_decodeMethod(method), {})
+
+
+def optimize(method:CompiledCode)->int:
+    """run the peephole optimizer over the code of method
+    and resolve the branch targets.
+    :return: number of instructions eliminated
+    """
+    instructions = _decodeMethod(method)
+    before = len(instructions)
+    forward = {}
+    changed = True
+    while changed:
+        instructions, changed = _peephole(instructions, forward)
+    method.code = _encode(instructions, forward)
+    eliminated = before - len(instructions)
+    method.meta["eliminated"] = eliminated
+    logging.info("optimized word '%s': %s of %s instructions eliminated",
+                 method.name, eliminated, before)
+    return eliminated
@@ -0,0 +1,73 @@
+"""
+==============
+PyForth Output
+==============
+Buffered output of an interpreter.
+
+Printing words write to the OutputSink of their interpreter instead of
+calling print(). The sink collects the text and passes it on to its target
+when the buffer is full, at the end of a line if it is line buffered, and
+when the interpreter has finished interpreting its input.
+
+@author: stephanmeyn
+"""
+
+from __future__ import annotations
+
+import sys
+from typing import Any, Callable
+
+# pylint: disable="invalid-name"
+
+BUFFER_SIZE = 8192  # characters collected before passing them to the target
+
+
+class OutputSink():
+    """collects output and writes it to a target.
+
+    The target is one of
+       - None: sys.stdout at the time of flushing
+       - an object with a write method, e.g. a StringIO or an open file
+       - a callable taking the text
+    """
+
+    def __init__(self, target:Any=None, bufferSize:int=BUFFER_SIZE, lineBuffered:bool=False):
+        """
+        :param bufferSize: flush when this many characters are collected, 0 flushes every write
+        :param lineBuffered: flush whenever a line is complete
+        """
+        self.target = target
+        self.bufferSize = bufferSize
+        self.lineBuffered = lineBuffered
+        self._parts:list[str] = []
+        self._size = 0
+        self.written = 0  # characters written since the sink was created
+
+    def write(self, text:str)->None:
+        """add text to the output"""
+        self._parts.append(text)
+        self._size += len(text)
+        self.written += len(text)
+        if self._size >= self.bufferSize or (self.lineBuffered and "\n" in text):
+            self.flush()
+
+    def print(self, *values, sep:str=" ", end:str="\n")->None:
+        """add values to the output like print()"""
+        self.write(sep.join(map(str, values)) + end)
+
+    def flush(self)->None:
+        """pass the collected output to the target"""
+        if not self._parts:
+            return
+        text = "".join(self._parts)
+        self._parts = []
+        self._size = 0
+        target = sys.stdout if self.target is None else self.target
+        write:Callable[[str], Any] = getattr(target, "write", target)
+        write(text)
+        if hasattr(target, "flush"):
+            target.flush()
+
+    def pending(self)->str:
+        """the output not passed to the target yet"""
+        return "".join(self._parts)
@@ -0,0 +1,165 @@
+"""
+================
+PyForth Parallel
+================
+Map a word over the items of an array in worker processes.
+
+The workers are interpreters restored from an image of the calling
+interpreter, so they know the same words and start with the same RAM.
+They are started again when the words of the caller change. When only its
+RAM changed, the RAM is sent along with the chunks of the next map instead.
+The array is split into chunks. Each worker runs the word on the items of a
+chunk, starting with an empty stack, and returns what is left on its stack.
+The results of the chunks are put together in the order of the items.
+
+Changes a worker makes to its RAM are not visible to the caller and are
+undone before the worker runs the next chunk.
+
+@author: stephanmeyn
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import io
+import logging
+import os
+import pickle
+from itertools import repeat
+from typing import TYPE_CHECKING, Any, Sequence
+
+from pyforth import image
+from pyforth.exceptions import ExecutionError
+
+if TYPE_CHECKING:
+    from pyforth.runtime import Interpreter, MethodABC
+
+# pylint: disable="invalid-name"
+# pylint: disable="consider-using-f-string"
+# pylint: disable="global-statement"
+# pylint: disable="protected-access"
+
+MIN_ITEMS = 10000  # smaller arrays are mapped serially
+CHUNKS_PER_WORKER = 4  # default number of chunks given to each worker
+
+_worker:Interpreter|None = None  # the interpreter of a worker process
+_memToken = 0  # the RAM of the caller the worker runs with, see Workers.memToken
+_memData:bytes|None = None  # that RAM, pickled
+_memVersion = 0  # version of the worker RAM when it was restored from _memData
+
+
+def _dumpsMem(mem)->bytes:
+    buffer = io.BytesIO()
+    image._Pickler(buffer, protocol=pickle.HIGHEST_PROTOCOL).dump(mem)
+    return buffer.getvalue()
+
+
+def _loadsMem(data:bytes):
+    return image._Unpickler(io.BytesIO(data)).load()
+
+
+def _initWorker(data:bytes):
+    global _worker, _memData, _memVersion
+    from pyforth.runtime import Interpreter
+    _worker = Interpreter()
+    image.loads(_worker, data)
+    _memData = _dumpsMem(_worker.mem)
+    _memVersion = _worker.mem.version
+
+
+def _syncMem(token:int, data:bytes|None):
+    """give the worker the RAM of the caller with token,
+    undoing the changes made by earlier chunks"""
+    global _memToken, _memData, _memVersion
+    if token != _memToken:
+        _memToken, _memData = token, data
+    elif _worker.mem.version == _memVersion:
+        return
+    _worker.mem = _loadsMem(_memData)
+    _memVersion = _worker.mem.version
+
+
+def _runChunk(name:str, items:Sequence, memToken:int, memData:bytes|None)->tuple[bool, Any]:
+    """run the word called name on each item, with the RAM of the caller.
+    :return: (True, the stack) or (False, error message)"""
+    _syncMem(memToken, memData)
+    method = _worker.find_word(name)
+    _worker.stack = []
+    try:
+        for item in items:
+            _worker.stack.append(item)
+            _worker.execute(method, None)
+    except Exception as ex:  # pylint: disable=broad-except
+        return False, "{}: {}".format(type(ex).__name__, ex)
+    return True, _worker.stack
+
+
+def mapSerial(engine:Interpreter, method:MethodABC, items:Sequence)->list:
+    """run method on each item with an empty stack, return what is left on the stack"""
+    saved = engine.stack
+    engine.stack = []
+    try:
+        for item in items:
+            engine.stack.append(item)
+            engine.execute(method, None)
+        return engine.stack
+    finally:
+        engine.stack = saved
+
+
+class Workers():
+    """a process pool of interpreters restored from the image of an engine"""
+
+    def __init__(self, engine:Interpreter, nrWorkers:int|None=None):
+        self.nrWorkers = nrWorkers or os.cpu_count() or 1
+        self.generation = engine.vocabularyGeneration
+        self.mem = engine.mem
+        self.memVersion = engine.mem.version
+        self.memToken = 0  # bumped when the RAM of the engine is sent, 0 is the RAM of the image
+        self.memData:bytes|None = None  # the RAM sent with memToken
+        self.executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.nrWorkers, initializer=_initWorker, initargs=(image.dumps(engine),))
+
+    def isCurrent(self, engine:Interpreter, nrWorkers:int|None)->bool:
+        """true if the workers know the current words of engine"""
+        return self.generation == engine.vocabularyGeneration and nrWorkers in (None, self.nrWorkers)
+
+    def syncMem(self, engine:Interpreter):
+        """pickle the RAM of engine if it changed since it was last sent"""
+        if engine.mem is not self.mem or engine.mem.version != self.memVersion:
+            self.mem = engine.mem
+            self.memVersion = engine.mem.version
+            self.memData = _dumpsMem(engine.mem)
+            self.memToken += 1
+
+    def map(self, engine:Interpreter, name:str, items:Sequence, chunkSize:int)->list:
+        self.syncMem(engine)
+        result = []
+        chunks = (items[pos: pos + chunkSize] for pos in range(0, len(items), chunkSize))
+        for ok, value in self.executor.map(_runChunk, repeat(name), chunks,
+                                           repeat(self.memToken), repeat(self.memData)):
+            if not ok:
+                raise ExecutionError(name, value)
+            result.extend(value)
+        return result
+
+    def shutdown(self):
+        self.executor.shutdown(cancel_futures=True)
+
+
+def pmap(engine:Interpreter, method:MethodABC, items:Sequence, chunkSize:int|None=None,
+         nrWorkers:int|None=None, minItems:int=MIN_ITEMS)->list:
+    """run method on each item in worker processes, see Interpreter.pmap"""
+    items = items if isinstance(items, Sequence) else list(items)
+    if len(items) < max(minItems, 1) or nrWorkers == 1 \
+            or engine.find_word(str(method.name)) is not method:
+        return mapSerial(engine, method, items)
+    workers = engine.workers
+    if workers is None or not workers.isCurrent(engine, nrWorkers):
+        if workers is not None:
+            workers.shutdown()
+        logging.info("starting pmap workers")
+        workers = engine.workers = Workers(engine, nrWorkers)
+    if chunkSize is None:
+        chunkSize = -(-len(items) // (workers.nrWorkers * CHUNKS_PER_WORKER))
+    return workers.map(engine, str(method.name), items, max(chunkSize, 1))
@@ -0,0 +1,178 @@
+"""
+============
+PyForth Pool
+============
+Reuse warmed up interpreters for many short jobs.
+
+An InterpreterPool creates interpreters on demand, runs a setup function on
+each new one (e.g. to LOAD the application) and takes a snapshot of it.
+When an interpreter is released, it is restored to that snapshot: stacks,
+input, compile state, RAM, search order and the definitions made since.
+
+    pool = InterpreterPool(lambda engine: engine.interpret('"app.forth" LOAD'))
+    with pool.engine() as engine:
+        engine.interpret("JOB")
+
+@author: stephanmeyn
+"""
+
+from __future__ import annotations
+
+import contextlib
+import pickle
+import threading
+import time
+import weakref
+from typing import Any, Callable, Iterator
+
+from pyforth.runtime import Interpreter
+
+# pylint: disable="invalid-name"
+
+
+class _Snapshot():
+    """the state of an interpreter restored on release"""
+
+    def __init__(self, engine:Interpreter):
+        self.words = {name: dict(_ownWords(voc)) for name, voc in engine.vocabularies.items()}
+        self.context = engine.context
+        self.definitions = engine.definitions
+        self.mem = pickle.dumps(engine.mem) if "mem" in vars(engine) else None
+        self.loadedFiles = set(engine.loadedFiles)
+        self.output = engine.output
+        self.generation = engine.generation
+
+    def restore(self, engine:Interpreter):
+        engine.reset(soft=True)
+        engine.inputSource = None
+        engine.inputStack.clear()
+        engine.leavestack.clear()
+        engine.compilingMethod = None
+        engine.trace = None
+        engine.profiling = False
+        engine.scheduler = None
+        engine.output = self.output
+        engine.loadedFiles = set(self.loadedFiles)
+        engine.context = self.context
+        engine.definitions = self.definitions
+        if self.mem is None:
+            vars(engine).pop("mem", None)
+        else:
+            engine.mem = pickle.loads(self.mem)
+        if self.generation != engine.generation:
+            self._restoreWords(engine)
+
+    def _restoreWords(self, engine:Interpreter):
+        changed = False
+        for name in list(engine.vocabularies):
+            if name not in self.words:
+                del engine.vocabularies[name]
+                changed = True
+                continue
+            words = _ownWords(engine.vocabularies[name])
+            if words != self.words[name]:
+                words.clear()
+                words.update(self.words[name])
+                changed = True
+        if changed:
+            engine.vocabularyChanged()
+        self.generation = engine.generation
+
+
+def _ownWords(voc)->dict:
+    """the words of a vocabulary that belong to the interpreter"""
+    return voc.maps[0] if hasattr(voc, "maps") else voc
+
+
+class InterpreterPool():
+    """hands out interpreters prepared by setup and takes them back"""
+
+    def __init__(self, setup:Callable[[Interpreter], Any]|None=None, maxSize:int=8,
+                 idleTimeout:float|None=300.0, **kwargs):
+        """
+        :param setup: called with each new interpreter, e.g. to load vocabularies
+        :param maxSize: number of idle interpreters kept
+        :param idleTimeout: seconds an idle interpreter is kept, None keeps them
+        :param kwargs: passed to the Interpreter constructor
+        """
+        self.setup = setup
+        self.maxSize = maxSize
+        self.idleTimeout = idleTimeout
+        self.kwargs = kwargs
+        self._idle:list[tuple[float, Interpreter]] = []  # (released at, engine), latest last
+        self._snapshots:weakref.WeakKeyDictionary[Interpreter, _Snapshot] = weakref.WeakKeyDictionary()
+        self._busy:weakref.WeakSet[Interpreter] = weakref.WeakSet()  # handed out, not released yet
+        self._lock = threading.Lock()
+
+    def __len__(self)->int:
+        """number of idle interpreters"""
+        return len(self._idle)
+
+    def create(self)->Interpreter:
+        """a new interpreter prepared by setup"""
+        engine = Interpreter(**self.kwargs)
+        if self.setup is not None:
+            self.setup(engine)
+        engine.reset(soft=True)
+        engine.output.flush()
+        self._snapshots[engine] = _Snapshot(engine)
+        with self._lock:
+            self._busy.add(engine)
+        return engine
+
+    def acquire(self)->Interpreter:
+        """an idle interpreter, or a new one if none is idle"""
+        with self._lock:
+            self._evict(time.monotonic())
+            if self._idle:
+                engine = self._idle.pop()[1]
+                self._busy.add(engine)
+                return engine
+        return self.create()
+
+    def release(self, engine:Interpreter)->None:
+        """restore the interpreter and keep it for the next acquire.
+        Raises ValueError if the interpreter was not handed out by this pool
+        or was released already"""
+        with self._lock:
+            if engine not in self._busy:
+                raise ValueError("interpreter was not handed out by this pool or released already")
+            self._busy.discard(engine)
+        snapshot = self._snapshots[engine]
+        engine.output.flush()
+        snapshot.restore(engine)
+        with self._lock:
+            now = time.monotonic()
+            self._idle.append((now, engine))
+            self._evict(now)
+            while len(self._idle) > self.maxSize:
+                self._discard(self._idle.pop(0)[1])
+
+    @contextlib.contextmanager
+    def engine(self)->Iterator[Interpreter]:
+        """acquire an interpreter for the duration of a with block"""
+        engine = self.acquire()
+        try:
+            yield engine
+        finally:
+            self.release(engine)
+
+    def evictIdle(self)->None:
+        """drop the interpreters idle for longer than idleTimeout"""
+        with self._lock:
+            self._evict(time.monotonic())
+
+    def clear(self)->None:
+        """drop all idle interpreters"""
+        with self._lock:
+            while self._idle:
+                self._discard(self._idle.pop()[1])
+
+    def _evict(self, now:float):
+        if self.idleTimeout is None:
+            return
+        while self._idle and now - self._idle[0][0] > self.idleTimeout:
+            self._discard(self._idle.pop(0)[1])
+
+    def _discard(self, engine:Interpreter):
+        self._snapshots.pop(engine, None)
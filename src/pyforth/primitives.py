@@ -7,7 +7,7 @@ import logging
 # from calendar import formatstring
 from pyforth.exceptions import WordNotFoundError, ExecutionError
 
-from pyforth.runtime import CallFrame, CompiledPrimitive, vocabulary
+from pyforth.runtime import CallFrame, CompiledPrimitive, vocabulary, vocabularyChanged
 
 # pylint: disable="invalid-name"
 # pylint: disable="logging-format-interpolation"
@@ -210,3 +210,4 @@ class forthprim():
             executeOnly=self.executeOnly,
             inColonOnly=self.inColonOnly,
         )
+        vocabularyChanged()
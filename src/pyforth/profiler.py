@@ -0,0 +1,114 @@
+"""
+================
+PyForth Profiler
+================
+Collect call counts and timings of the words executed by an interpreter.
+
+Start and stop it with `Interpreter.startProfiling()` / `stopProfiling()`
+or the words PROFILE-ON, PROFILE-OFF and PROFILE-REPORT.
+
+@author: stephanmeyn
+"""
+
+from __future__ import annotations
+
+import marshal
+from collections import Counter, defaultdict
+from time import perf_counter
+
+# pylint: disable="invalid-name"
+# pylint: disable="consider-using-f-string"
+
+PSTATS_FILE = "<forth>"  # file name used for words in pstats data
+
+
+class WordStats():
+    """timings of one word"""
+
+    def __init__(self):
+        self.calls = 0
+        self.inclusive = 0.0  # seconds, including the words it called
+        self.exclusive = 0.0  # seconds, spent in the word itself
+
+    def asDict(self)->dict:
+        return {"calls": self.calls, "inclusive": self.inclusive, "exclusive": self.exclusive}
+
+
+class Profiler():
+    """collects statistics of executed words"""
+
+    def __init__(self):
+        self.words:dict[str, WordStats] = defaultdict(WordStats)
+        self.xpCounts:dict[str, Counter] = defaultdict(Counter)  # per compiled word
+        self.callers:dict[tuple[str, str], WordStats] = defaultdict(WordStats)
+        self.stacks:Counter = Counter()  # call path -> exclusive seconds
+        self._path:list[str] = []
+        self._childTime:list[float] = [0.0]
+
+    def call(self, method, run, *args):
+        """run(*args) as an invocation of method and record its timing"""
+        name = str(method.name)
+        caller = self._path[-1] if self._path else None
+        self._path.append(name)
+        self._childTime.append(0.0)
+        start = perf_counter()
+        try:
+            run(*args)
+        finally:
+            elapsed = perf_counter() - start
+            exclusive = elapsed - self._childTime.pop()
+            self._childTime[-1] += elapsed
+            self.stacks[";".join(self._path)] += exclusive
+            self._path.pop()
+            for stats in (self.words[name], self.callers[(caller, name)]):
+                stats.calls += 1
+                stats.inclusive += elapsed
+                stats.exclusive += exclusive
+
+    def countXp(self, method, xp:int):
+        """count the execution of the instruction at xp of a compiled word"""
+        self.xpCounts[str(method.name)][xp] += 1
+
+    def report(self)->dict:
+        """return the statistics as a dict keyed by word name"""
+        result = {}
+        for name, stats in self.words.items():
+            result[name] = stats.asDict()
+            if name in self.xpCounts:
+                result[name]["xp"] = dict(sorted(self.xpCounts[name].items()))
+        return result
+
+    def formatReport(self, limit:int=20)->str:
+        """return a table of the words with the highest exclusive time"""
+        lines = ["{:>20} {:>10} {:>12} {:>12}".format("word", "calls", "inclusive", "exclusive")]
+        ranked = sorted(self.words.items(), key=lambda item: item[1].exclusive, reverse=True)
+        for name, stats in ranked[:limit]:
+            lines.append("{:>20} {:>10} {:>12.6f} {:>12.6f}".format(
+                name[:20], stats.calls, stats.inclusive, stats.exclusive))
+        return "\n".join(lines)
+
+    def collapsed(self)->str:
+        """return the call paths in collapsed stack format, as read by flamegraph.pl.
+        Counts are exclusive microseconds"""
+        lines = ["{} {}".format(path, round(seconds * 1e6))
+                 for path, seconds in sorted(self.stacks.items())]
+        return "\n".join(lines) + "\n"
+
+    def pstats(self)->dict:
+        """return the statistics in the format of pstats.Stats.stats"""
+
+        def key(name):
+            return (PSTATS_FILE, 0, name)
+
+        result = {}
+        for name, stats in self.words.items():
+            callers = {key(caller): (s.calls, s.calls, s.exclusive, s.inclusive)
+                       for (caller, callee), s in self.callers.items()
+                       if callee == name and caller is not None}
+            result[key(name)] = (stats.calls, stats.calls, stats.exclusive, stats.inclusive, callers)
+        return result
+
+    def dumpStats(self, path:str):
+        """write the statistics to a file readable by pstats.Stats"""
+        with open(path, "wb") as fd:
+            marshal.dump(self.pstats(), fd)
@@ -9,10 +9,15 @@ This is the interpreter implementation of PyForth
 
 from __future__ import annotations
 
+import functools
 import logging
-from typing import Any, Optional 
+import os
+import re
+from array import array
+from typing import Any, Callable, Iterator, NamedTuple, Optional
 from io import StringIO
 # import pyforth.primitives as primitives
+from pyforth.output import OutputSink
 from pyforth.exceptions import CompilationError, WordNotFoundError, ExecutionError
 # from pyforth.primitives import MethodABC, CompiledPrimitive, CompiledCode, CompiledConstant
 # pylint: disable="invalid-name"
@@ -20,11 +25,53 @@ from pyforth.exceptions import CompilationError, WordNotFoundError, ExecutionErr
 # pylint: disable="missing-function-docstring"
 # pylint: disable="consider-using-f-string"
 # pylint: disable="protected-access"
-from collections import OrderedDict
+from collections import ChainMap
+from types import MappingProxyType
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from pyforth.parallel import Workers
+    from pyforth.profiler import Profiler
+    from pyforth.tasks import Scheduler, Task
 
 
 vocabulary = {}
 
+NUMBER_CACHE_SIZE = 4096  # tokens remembered by parseNumber
+WORD_CACHE_SIZE = 4096  # lookups remembered by an interpreter per generation
+_NOT_CACHED = object()
+
+# bumped whenever the shared core vocabulary changes,
+# invalidates the words cached by all interpreters.
+# Changes to the words or search order of one interpreter
+# bump its own generation, see Interpreter.vocabularyChanged
+_generation = 0
+
+
+def vocabularyChanged()->None:
+    """invalidate the word lookups cached by all interpreters"""
+    global _generation
+    _generation += 1
+
+
+_DIGIT = re.compile(r"\d")
+
+
+@functools.lru_cache(maxsize=NUMBER_CACHE_SIZE)
+def _parseNumber(w:str)->int|float|None:
+    try:
+        if "." in w:
+            return float(w)
+        return int(w)
+    except ValueError:
+        return None
+
+
+def parseNumber(w:str)->int|float|None:
+    """return the number w stands for or None"""
+    if _DIGIT.search(w) is None:
+        return None  # neither int() nor float() accept a token without digits
+    return _parseNumber(w)
+
 
 class MethodABC():
     """base class for words"""
@@ -53,7 +100,7 @@ class MethodABC():
 
     def appendDocQuote(self, quote):
         """append a doc quote to the words meta information"""
-        logging.debug("adding doc string '{}'".format(quote))
+        logging.debug("adding doc string '%s'", quote)
         
         self.docstring.append(quote)
 
@@ -79,6 +126,8 @@ class CompiledCode(MethodABC):
                         executeOnly=executeOnly, inColonOnly=inColonOnly,
                         )        
         self.code = []
+        self.threaded:list|None = None  # direct threaded form of code, see thread()
+        self.native = None  # python function generated by pyforth.codegen
         self.xp = 0
 
     def __str__(self):
@@ -89,6 +138,18 @@ class CompiledCode(MethodABC):
 
         return result
 
+    def thread(self)->None:
+        """build the direct threaded form of the code: one callable per cell,
+        taking (engine, caller), with constants and callees pre-bound."""
+        self.threaded = [_threadedOp(method) for method in self.code]
+
+    def __getstate__(self)->dict:
+        """the threaded and native forms are rebuilt after unpickling"""
+        state = self.__dict__.copy()
+        state["threaded"] = None
+        state["native"] = None
+        return state
+
     def showCode(self):
         """return a string of code names"""
         
@@ -149,28 +210,249 @@ class CompiledConstant(MethodABC):
         engine.stack.append(self.constantValue)
 
 
+class BranchTarget(CompiledConstant):
+    """
+    the operand of a branching word in a completed word: 
+    the absolute address to continue at when the branch is taken
+    """
+
+    def __init__(self, target:int):
+        super().__init__(target)
+        self.target = target
+
+    def __str__(self):
+        return "Branch to {}".format(self.target)
+
+
+def _threadedOp(method:MethodABC):
+    """return the callable executing method inside threaded code"""
+    if type(method) is CompiledPrimitive:
+        return method.func
+    if type(method) is CompiledConstant:
+        value = method.constantValue
+
+        def pushConstant(engine, caller):
+            engine.stack.append(value)
+        return pushConstant
+
+    def call(engine, caller):
+        engine.execute(method, caller)
+    return call
+
+
+class TraceEvent(NamedTuple):
+    """reported to the trace hook of the interpreter before a word is executed"""
+    method: CompiledCode  # the compiled word being run
+    word: MethodABC  # the word about to be executed
+    xp: int  # its address within method
+    depth: int  # depth of the stack
+
+
+def loggingTrace(event:TraceEvent)->None:
+    """trace hook writing events to the debug log"""
+    logging.debug("execute::nextWord %s@%s: %s, depth %s",
+                  event.method.name, event.xp, event.word.name, event.depth)
+
+
+PAGE_BITS = 10
+PAGE_SIZE = 1 << PAGE_BITS  # cells per page of RAM
+PAGE_MASK = PAGE_SIZE - 1
+
+
+READ_CHUNK = 1 << 16  # characters read at a time by readFrom
+
+_NON_BLANK = re.compile(r"\S")
+_WORD = re.compile(r"\S+")
+
+
+def _chunks(aStream)->Iterator[str]:
+    """the chunks of text of a stream with a read method,
+    or the lines of an iterable, each ending with a newline"""
+    read = getattr(aStream, "read", None)
+    if read is None:
+        for line in aStream:
+            yield line if line.endswith("\n") else line + "\n"
+        return
+    chunk = read(READ_CHUNK)
+    while chunk:
+        yield chunk
+        chunk = read(READ_CHUNK)
+
+
+def _cellValue(typecode:str, val:Any)->int|float:
+    """val converted to a cell of a region with the array typecode"""
+    if val is None:
+        return 0
+    if isinstance(val, (int, float)):
+        return float(val) if typecode == "d" else int(val)
+    raise ExecutionError(val, "cannot store {!r} in a region of {} cells".format(
+        val, "float" if typecode == "d" else "integer"))
+
+
+class TypedRegion(NamedTuple):
+    """a range of RAM backed by an array of numbers"""
+    base: int  # first address
+    size: int  # number of cells
+    data: array  # the cells, rounded up to whole pages
+
+
 class RAM():
-    """Randiom access memory with safe access"""
+    """Random access memory with safe access.
+    Memory is allocated in pages of PAGE_SIZE cells on the first write to a page,
+    so only the pages a program touches take up space.
+    
+    Numeric regions allocated with allocate() are backed by an array. Their pages
+    are memoryviews into the array, holding 8 bytes per cell.
+    
+    version counts the changes made, so a copy of the RAM can tell it is stale."""
     def __init__(self):
-        self.mem=[]
+        self.pages:dict[int, list[Any]|memoryview] = {}  # page number -> cells
+        self.size = 0  # one past the highest address written
+        self.regions:list[TypedRegion] = []
+        self.version = 0  # bumped by every change
+
+    def __getstate__(self)->dict:
+        """pages of regions are views into the region arrays, they are not pickled"""
+        pages = {pageNr: page for pageNr, page in self.pages.items() if type(page) is list}
+        return {"pages": pages, "size": self.size, "regions": self.regions}
+
+    def __setstate__(self, state:dict):
+        self.pages = state["pages"]
+        self.size = state["size"]
+        self.regions = [TypedRegion(*region) for region in state["regions"]]
+        self.version = 0
+        for region in self.regions:
+            view = memoryview(region.data)
+            for pageIdx in range(len(region.data) >> PAGE_BITS):
+                self.pages[(region.base >> PAGE_BITS) + pageIdx] = \
+                    view[pageIdx * PAGE_SIZE: (pageIdx + 1) * PAGE_SIZE]
     
+    def __len__(self)->int:
+        return self.size
+
     def __getitem__(self, idx: int)-> Any|None:
         """get an item. If outside of allocated mem, return None"""
-        if idx < len(self.mem):
-            return self.mem[idx]
-        return None
+        page = self.pages.get(idx >> PAGE_BITS)
+        if page is None:
+            return None
+        return page[idx & PAGE_MASK]
 
     def __setitem__(self, idx: int, val: Any)-> None:
         """set an item. If outside of allocated mem, allocate mem"""
-        while idx >= len(self.mem):
-            self.mem.append(None)
-        self.mem[idx] = val
-        
+        page = self.pages.get(idx >> PAGE_BITS)
+        if page is None:
+            page = self.pages[idx >> PAGE_BITS] = [None] * PAGE_SIZE
+        try:
+            page[idx & PAGE_MASK] = val
+        except TypeError:  # only raised by the memoryview of a region
+            page[idx & PAGE_MASK] = _cellValue(page.format, val)
+        self.version += 1
+        if idx >= self.size:
+            self.size = idx + 1
+
+    def allocate(self, nrItems:int, typecode:str="q")->int:
+        """allocate a region of nrItems numeric cells and return its address.
+        :param typecode: array typecode, 'q' for integers, 'd' for floats
+        The region starts on a page boundary and is initialised to 0.
+        It takes up whole pages, the cells following it start on the next page"""
+        base = ((self.size + PAGE_MASK) >> PAGE_BITS) << PAGE_BITS
+        nrPages = (nrItems + PAGE_MASK) >> PAGE_BITS
+        data = array(typecode, bytes(array(typecode).itemsize * nrPages * PAGE_SIZE))
+        view = memoryview(data)
+        for pageIdx in range(nrPages):
+            self.pages[(base >> PAGE_BITS) + pageIdx] = \
+                view[pageIdx * PAGE_SIZE: (pageIdx + 1) * PAGE_SIZE]
+        self.regions.append(TypedRegion(base, nrItems, data))
+        self.size = base + nrPages * PAGE_SIZE  # the padding is numeric too
+        self.version += 1
+        return base
 
     def append(self, item)->int:
         """add an item to RAM and return its address"""
-        self.mem.append(item)
-        return len(self.mem)-1
+        addr = self.size
+        self[addr] = item
+        return addr
+
+    def spans(self, start:int, nrItems:int):
+        """split a range of addresses at page boundaries.
+        yields (page number, first offset, end offset, position in range)"""
+        pos = 0
+        while pos < nrItems:
+            addr = start + pos
+            offset = addr & PAGE_MASK
+            end = min(PAGE_SIZE, offset + nrItems - pos)
+            yield addr >> PAGE_BITS, offset, end, pos
+            pos += end - offset
+
+    def read(self, start:int, nrItems:int)->list[Any]:
+        """return nrItems cells starting at start"""
+        result = [None] * nrItems
+        for pageNr, offset, end, pos in self.spans(start, nrItems):
+            page = self.pages.get(pageNr)
+            if type(page) is memoryview:
+                result[pos: pos + end - offset] = page[offset:end].tolist()
+            elif page is not None:
+                result[pos: pos + end - offset] = page[offset:end]
+        return result
+
+    def write(self, start:int, items:list[Any])->None:
+        """store items in consecutive cells starting at start.
+        Pages not allocated yet are only allocated if an item is not None"""
+        for pageNr, offset, end, pos in self.spans(start, len(items)):
+            chunk = items[pos: pos + end - offset]
+            page = self.pages.get(pageNr)
+            if page is None:
+                if all(item is None for item in chunk):
+                    continue
+                page = self.pages[pageNr] = [None] * PAGE_SIZE
+            if type(page) is memoryview:
+                try:
+                    chunk = array(page.format, [0 if item is None else item for item in chunk])
+                except TypeError:
+                    chunk = array(page.format, [_cellValue(page.format, item) for item in chunk])
+            page[offset:end] = chunk
+        self.version += 1
+        if items and start + len(items) > self.size:
+            self.size = start + len(items)
+
+    def fill(self, start:int, nrItems:int, value:Any)->None:
+        """set nrItems cells starting at start to value.
+        Filling with None does not allocate pages"""
+        if nrItems <= 0:
+            return
+        for pageNr, offset, end, _ in self.spans(start, nrItems):
+            page = self.pages.get(pageNr)
+            if page is None:
+                if value is None:
+                    continue
+                page = self.pages[pageNr] = [None] * PAGE_SIZE
+            if type(page) is memoryview:
+                page[offset:end] = array(page.format, [_cellValue(page.format, value)]) * (end - offset)
+            else:
+                page[offset:end] = [value] * (end - offset)
+        self.version += 1
+        if start + nrItems > self.size:
+            self.size = start + nrItems
+
+    def copy(self, origin:int, destination:int, nrItems:int)->None:
+        """copy nrItems cells from origin to destination. 
+        The ranges may overlap"""
+        if nrItems <= 0 or origin == destination:
+            return
+        self.write(destination, self.read(origin, nrItems))
+
+    def move(self, origin:int, destination:int, nrItems:int)->None:
+        """move nrItems cells from origin to destination, 
+        the vacated cells not overwritten by the move are set to None"""
+        if nrItems <= 0 or origin == destination:
+            return
+        self.copy(origin, destination, nrItems)
+        if destination >= origin + nrItems or destination + nrItems <= origin:
+            self.fill(origin, nrItems, None)
+        elif destination > origin:
+            self.fill(origin, destination - origin, None)
+        else:
+            self.fill(destination + nrItems, origin - destination, None)
 
 
 
@@ -197,19 +479,77 @@ class CallFrame():
             return
         self.xp = 0
         self.isCompiled = True
-        while self.xp < len(self.method.code):
-            nextWord = self.method.code[self.xp]
-            logging.debug("execute::nextWord @{}: {}".format(self.xp, nextWord))
+        if engine.trace is not None:
+            self.runTraced(engine, engine.trace)
+        elif engine.profiling:
+            self.runProfiled(engine, engine.profiler)
+        elif engine.native and self.method.native is not None:
+            self.method.native(engine, self)
+        elif engine.threaded and self.method.threaded is not None:
+            self.runThreaded(engine)
+        else:
+            self.run(engine)
+
+    def run(self, engine:Interpreter):
+        """interpret the code of the method"""
+        code = self.method.code
+        while self.xp < len(code):
+            nextWord = code[self.xp]
+            self.xp = self.xp + 1
+            try:
+                # primitives and constants are dispatched directly from this
+                # frame, only compiled code gets a frame of its own
+                wordType = type(nextWord)
+                if wordType is CompiledPrimitive:
+                    nextWord.func(engine, self)
+                elif wordType is CompiledConstant:
+                    engine.stack.append(nextWord.constantValue)
+                else:
+                    engine.execute(nextWord, self)
+            except Exception:
+                logging.error("Execute of word %s, xp= %s", self.method.name, self.xp - 1)
+                raise
+
+    def runTraced(self, engine:Interpreter, trace:Callable[[TraceEvent], None]):
+        """interpret the code of the method, reporting each word to trace"""
+        code = self.method.code
+        while self.xp < len(code):
+            nextWord = code[self.xp]
+            trace(TraceEvent(self.method, nextWord, self.xp, len(engine.stack)))
+            self.xp = self.xp + 1
+            try:
+                engine.execute(nextWord, self)
+            except Exception:
+                logging.error("Execute of word %s, xp= %s", self.method.name, self.xp - 1)
+                raise
+
+    def runProfiled(self, engine:Interpreter, profiler:Profiler):
+        """interpret the code of the method, counting each executed xp.
+        Every word runs through engine.execute, which records its timing"""
+        code = self.method.code
+        while self.xp < len(code):
+            nextWord = code[self.xp]
+            profiler.countXp(self.method, self.xp)
             self.xp = self.xp + 1
             try:
-                # nextWord.execute(engine, self)
                 engine.execute(nextWord, self)
             except Exception:
-                logging.error(
-                    "Execute of word {}, xp= {}".format(self.method.name, self.xp - 1)
-                )
+                logging.error("Execute of word %s, xp= %s", self.method.name, self.xp - 1)
                 raise
 
+    def runThreaded(self, engine:Interpreter):
+        """run the direct threaded form of the method"""
+        ops = self.method.threaded
+        end = len(ops)
+        try:
+            while self.xp < end:
+                op = ops[self.xp]
+                self.xp += 1
+                op(engine, self)
+        except Exception:
+            logging.error("Execute of word %s, xp= %s", self.method.name, self.xp - 1)
+            raise
+
     @property 
     def parent(self)->CallFrame|None:
         """get the parent frame from the engine stack"""
@@ -217,27 +557,43 @@ class CallFrame():
             return self.engine.callStack[-2]
         return None
 
-    #the following methods assume they are called from a primitive
-    # and hence parent is valid
+    #the following methods are called from a primitive. The primitive
+    # either got the frame of the compiled code it runs in (direct dispatch)
+    # or a frame of its own, in which case the parent holds the xp
+
+    @property
+    def codeFrame(self)->CallFrame:
+        """the frame running the compiled code, whose xp gets moved"""
+        if self.isCompiled:
+            return self
+        return self.parent
 
     @property
     def currentWord(self):
-        return self.parent.method.code[self.xp]
+        frame = self.codeFrame
+        return frame.method.code[frame.xp]
 
     def jump(self, addr):
         """helper - move the xp pointer to this address"""        
-        self.parent.xp = addr
+        self.codeFrame.xp = addr
 
     def jumpRelative(self, distance):
         """helper - jump relative"""
-        self.parent.xp += distance
+        self.codeFrame.xp += distance
+
+    def operand(self)->Any:
+        """fetch the value of the constant following the current word
+        and step over it"""
+        frame = self.codeFrame
+        value = frame.method.code[frame.xp].constantValue
+        frame.xp += 1
+        return value
 
     def branch(self):
-        """take the next primitive, which should be  a constant
-        and do a relative jump based on its value."""
-        offset = self.parent.method.code[self.parent.xp]
-        logging.debug("branching by {}".format(offset.constantValue))
-        self.jumpRelative(offset.constantValue)
+        """take the next primitive, which is a BranchTarget
+        and continue at its address."""
+        frame = self.codeFrame
+        frame.xp = frame.method.code[frame.xp].target
 
 
 
@@ -279,6 +635,7 @@ class forthprim():
             executeOnly=self.executeOnly,
             inColonOnly=self.inColonOnly,
         )
+        vocabularyChanged()
 
 
 
@@ -287,18 +644,41 @@ class Interpreter(object):
     Forth interpreter
     """
 
-    def __init__(self, vocabulary:dict=vocabulary):
+    threaded:bool = False  # run compiled code in its direct threaded form
+    native:bool = False  # translate compiled words into python functions
+    optimize:bool = True  # run the peephole optimizer over compiled words
+    loadCache:str|None = None  # directory caching the words compiled by LOAD
+
+    def __init__(self, vocabulary:dict=vocabulary, threaded:bool|None=None,
+                 native:bool|None=None, output:OutputSink|None=None):
         """
         Constructor
+        :param threaded: run compiled words in their direct threaded form,
+           defaults to Interpreter.threaded
+        :param native: translate compiled words into python functions and run
+           those, defaults to Interpreter.native
+        :param output: where printing words write to, defaults to a sink
+           writing to stdout
         """
-        self.vocabularies = OrderedDict()
-        self.vocabularies["FORTH"] = vocabulary        
+        self.output = OutputSink() if output is None else output
+        if threaded is not None:
+            self.threaded = threaded
+        if native is not None:
+            self.native = native
+        if not vocabulary:
+            from pyforth import words # cause all ords to be compiled  # noqa: F401
+        # words defined by this interpreter go into the first map,
+        # the core vocabulary is shared by all interpreters
+        self._core_vocabulary = ChainMap({}, MappingProxyType(vocabulary))
+        self.vocabularies = {"FORTH": self._core_vocabulary}
         self.context = "FORTH"  # start here looking for words to interpret
         self.definitions = "FORTH"   # start here for words to compile
-        self._core_vocabulary = vocabulary
-        self.reset()
+        self._wordCache:dict[tuple, MethodABC|None] = {}  # see find_word
+        self.generation = 0  # bumped when the words or search order of this interpreter change
+        self._wordCacheGeneration = -1
+        self._wordCacheCoreGeneration = -1
+        self._searchOrder:tuple[str, ...] = ()
         self.stack = []
-        self.mem = RAM()
         self.rp:list[Any] = []  # return pointer stack
         self.callStack:list[CallFrame]=[]
         self.isCompiling:bool = False
@@ -308,33 +688,85 @@ class Interpreter(object):
         self.compilingMethod:CompiledCode = None
         self.lastError = None
         self.CliInDocQuote = False
+        self.inputSource:Iterator[str]|None = None  # supplies the input following CLI
+        self.inputStack:list[tuple] = []  # inputs interrupted by interpret and readFrom, see pushInput
         self.leavestack:list[list[int]]=[] # all outstandign leave addresses to be fixed up
-        if not self._core_vocabulary:
-            from pyforth import words # cause all ords to be compiled  # noqa: F401
-    
+        self.trace:Callable[[TraceEvent], None]|None = None  # see setTrace
+        self.profiler:Profiler|None = None  # statistics, see startProfiling
+        self.profiling = False
+        self.loadedFiles:set[str] = set()  # real paths of the files loaded
+        self.filesRead:dict[str, str]|None = None  # real path -> hash of the files read by a cached LOAD
+        self.workers:Workers|None = None  # worker processes of pmap
+        self.scheduler:Scheduler|None = None  # runs the tasks, see pyforth.tasks
+        self.currentTask:Task|None = None  # the task running, None at the top level
+
+    def __getattr__(self, name:str):
+        """create the RAM on first use"""
+        if name == "mem":
+            self.mem = RAM()
+            return self.mem
+        raise AttributeError(name)
 
     def run(self):
         """run the interpreter"""
         prompt = "> "
         while True:
+            self.output.flush()
             self.CLI = str(input(prompt))
             self.CliIdx = 0
             self.__process_cli__()
 
     def interpret(self, cli:str):
         """Interpret a string """
-        savedCli = self.CLI
-        savedIdx = self.CliIdx
+        self.pushInput(cli)
+        try:
+            self.__process_cli__()
+        finally:
+            self.popInput()
+            if not self.inputStack:
+                self.output.flush()
+
+    def pushInput(self, cli:str, source:Iterator[str]|None=None)->None:
+        """make cli the input, followed by the chunks of source.
+        The current input is resumed by popInput"""
+        self.inputStack.append((self.CLI, self.CliIdx, self.inputSource))
         self.CLI = cli
         self.CliIdx = 0
-        self.__process_cli__()
-        self.CLI = savedCli
-        self.CliIdx = savedIdx
+        self.inputSource = source
+
+    def emit(self, *values, sep:str=" ", end:str="\n")->None:
+        """write values to the output, like print()"""
+        self.output.print(*values, sep=sep, end=end)
+
+    def popInput(self)->None:
+        """resume the input saved by pushInput"""
+        self.CLI, self.CliIdx, self.inputSource = self.inputStack.pop()
+
+    def refill(self, keepFrom:int|None=None)->bool:
+        """append the next chunk of the input source to the unread input.
+        :param keepFrom: first index of the input to keep, defaults to CliIdx
+        :return: False at the end of the input source
+        """
+        if self.inputSource is None:
+            return False
+        chunk = next(self.inputSource, None)
+        if chunk is None:
+            self.inputSource = None
+            return False
+        self.CLI = self.CLI[self.CliIdx if keepFrom is None else keepFrom:] + chunk
+        self.CliIdx = 0
+        return True
 
     def execute(self, method:MethodABC, caller:Optional[CallFrame]):
         """execute a method"""
         assert caller is None or isinstance(caller, CallFrame)        
         assert isinstance(method, MethodABC), f"{method} is not a method"
+        if self.profiling:
+            self.profiler.call(method, self._execute, method, caller)
+        else:
+            self._execute(method, caller)
+
+    def _execute(self, method:MethodABC, caller:Optional[CallFrame]):
         frame = CallFrame(method)
         try:
             self.callStack.append(frame)
@@ -342,6 +774,78 @@ class Interpreter(object):
         finally:
             self.callStack.pop()
 
+    def setTrace(self, trace:Callable[[TraceEvent], None]|None=loggingTrace)->None:
+        """set the hook called with a TraceEvent before each word executed 
+        inside compiled code. None switches tracing off.
+        Frames already running keep their mode."""
+        self.trace = trace
+
+    @classmethod
+    def from_image(cls, path:str, **kwargs)->Interpreter:
+        """create an interpreter from an image written by saveImage.
+        :param kwargs: passed to the constructor"""
+        engine = cls(**kwargs)
+        engine.loadImage(path)
+        return engine
+
+    def saveImage(self, path:str)->None:
+        """write the vocabularies, search order and RAM to an image file"""
+        from pyforth import image
+        image.save(self, path)
+
+    def loadImage(self, path:str)->None:
+        """restore the vocabularies, search order and RAM from an image file"""
+        from pyforth import image
+        image.load(self, path)
+
+    def pmap(self, method:MethodABC, items, chunkSize:int|None=None,
+             nrWorkers:int|None=None, minItems:int|None=None)->list:
+        """run method on each item in worker processes and
+        return what each run left on the stack, in the order of the items.
+        Each run starts with an empty stack. The workers are started from an
+        image of this interpreter and restarted when the words change.
+        The RAM is sent to the workers when it changed since the last call.
+        :param chunkSize: items given to a worker at a time
+        :param nrWorkers: number of worker processes, defaults to the number of cpus
+        :param minItems: fewer items are mapped in this process,
+           defaults to parallel.MIN_ITEMS
+        """
+        from pyforth import parallel
+        if minItems is None:
+            minItems = parallel.MIN_ITEMS
+        return parallel.pmap(self, method, items, chunkSize, nrWorkers, minItems)
+
+    def runTasks(self)->None:
+        """run the tasks started by SPAWN until all are done"""
+        if self.scheduler is not None:
+            self.scheduler.run()
+
+    def stopWorkers(self)->None:
+        """stop the worker processes of pmap"""
+        if self.workers is not None:
+            self.workers.shutdown()
+            self.workers = None
+
+    def startProfiling(self, reset:bool=False)->Profiler:
+        """start recording call counts and timings of executed words.
+        Continues with the previous statistics unless reset is true"""
+        from pyforth.profiler import Profiler
+        if reset or self.profiler is None:
+            self.profiler = Profiler()
+        self.profiling = True
+        return self.profiler
+
+    def stopProfiling(self)->Profiler|None:
+        """stop recording. The statistics are kept in profiler"""
+        self.profiling = False
+        return self.profiler
+
+    def profileReport(self)->dict:
+        """return the statistics recorded while profiling, keyed by word name"""
+        if self.profiler is None:
+            return {}
+        return self.profiler.report()
+
     @property 
     def context_vocabulary(self):
         return self.vocabularies[self.context]
@@ -358,24 +862,52 @@ class Interpreter(object):
         :return: str
         """
 
-        if self.CliIdx >= len(self.CLI):
-            return ""
-        start_idx = self.CliIdx
-
-        while self.CliIdx < len(self.CLI) and not self.CLI[self.CliIdx :].startswith(
-            delimiter
-        ):
-            self.CliIdx += 1
-        # print ("idx:{}, cliIdx:{}".format(idx, self.CliIdx))
-        # print(self.CLI)
-        w = self.CLI[start_idx : self.CliIdx]
-        if self.CLI[self.CliIdx :].startswith(delimiter):
-            self.CliIdx += len(delimiter)
+        return self._input_till(delimiter)[0]
 
-        return w
+    def _input_till(self, delimiter: str) -> tuple[str, bool]:
+        """as get_input_till, also return whether the delimiter was found"""
+        searchFrom = self.CliIdx
+        while True:
+            end_idx = self.CLI.find(delimiter, searchFrom)
+            if end_idx >= 0:
+                break
+            searchFrom = max(len(self.CLI) - self.CliIdx - len(delimiter) + 1, 0)
+            if not self.refill():
+                text = self.CLI[self.CliIdx:]
+                self.CliIdx = len(self.CLI)
+                return text, False
+        text = self.CLI[self.CliIdx:end_idx]
+        self.CliIdx = end_idx + len(delimiter)
+        return text, True
 
     def find_word(self, word)->MethodABC|None:
-        """find a word in a vocabulary"""
+        """find a word in the context vocabulary, then in all vocabularies
+        from the latest to FORTH.
+        Results are cached until a vocabulary or the search order changes"""
+        if self._wordCacheGeneration != self.generation or self._wordCacheCoreGeneration != _generation:
+            self._wordCache.clear()
+            self._wordCacheGeneration = self.generation
+            self._wordCacheCoreGeneration = _generation
+            self._searchOrder = tuple(self.vocabularies)
+        key = (word, self.context, self._searchOrder)
+        found = self._wordCache.get(key, _NOT_CACHED)
+        if found is _NOT_CACHED:
+            found = self._find_word(word)
+            if len(self._wordCache) >= WORD_CACHE_SIZE:
+                self._wordCache.clear()
+            self._wordCache[key] = found
+        return found
+
+    def vocabularyChanged(self)->None:
+        """invalidate the word lookups cached by this interpreter"""
+        self.generation += 1
+
+    @property
+    def vocabularyGeneration(self)->tuple[int, int]:
+        """changes whenever the words this interpreter finds may have changed"""
+        return _generation, self.generation
+
+    def _find_word(self, word)->MethodABC|None:
         voc = self.vocabularies[self.context]
         found = voc.get(word)
         if found:
@@ -390,11 +922,23 @@ class Interpreter(object):
 
     def __process_cli__(self):
         """process a command line"""
+        steps = self.interpretSteps()
+        for method in steps:
+            try:
+                self.execute(method, None)
+            except Exception as ex:
+                self.executeFailed(method, ex)
+                break
+
+    def interpretSteps(self)->Iterator[MethodABC]:
+        """parse the command line, compiling and pushing literals.
+        Yields each word to execute, the caller executes it before
+        resuming, as the word may read the input that follows it."""
         logging.debug("processCli start")
         word = self.nextWord()
         while word is not None:
             if isinstance(word, str):
-                logging.debug("next word: '{}'".format(word))
+                logging.debug("next word: '%s'", word)
                 if word.startswith('"'):
                     if self.isCompiling:
                         self.compileConstant(word[1:-1])
@@ -407,124 +951,111 @@ class Interpreter(object):
                         self.lastError = WordNotFoundError(
                             word, "Word '{}' not found in vocabulary".format(word)
                         )
-                        print("Word '{}' not found in vocabulary".format(word))
+                        self.emit("Word '{}' not found in vocabulary".format(word))
                         break
 
                     if self.isCompiling and not method.isImmediate:
                         self.compileMethod(method)
                     else:
-                        # method = self._core_vocabulary[word]
                         if method.inColonOnly and not self.isCompiling:
                             raise ExecutionError(
                                 word, "Word not allowed to be used in direct execution"
                             )
-                        try:
-                            # method.execute(self, None)
-                            self.execute(method, None)
-                        except Exception as ex:
-                            logging.exception(
-                                "exception during execute of word '{}'".format(word)
-                            )
-                            self.__postMortem__()
-                            print(ex)
-                            self.reset()
-                            self.lastError = ex
-                            break                   
+                        yield method
             elif isinstance(word, int) or isinstance(word, float):
-                logging.debug("next word is a number: {}".format(word))
+                logging.debug("next word is a number: %s", word)
                 if self.isCompiling:
                     self.compileConstant(word)
                 else:
                     self.stack.append(word)
             else:
-                logging.warning(
-                    "'{}' not found in vocabulary, nor a number".format(word)
-                )
+                logging.warning("'%s' not found in vocabulary, nor a number", word)
                 self.reset()
             word = self.nextWord()
 
+    def executeFailed(self, method:MethodABC, ex:Exception)->None:
+        """report an exception raised executing a word of the command line
+        and reset"""
+        logging.exception("exception during execute of word '%s'", method.name)
+        self.__postMortem__()
+        self.emit(ex)
+        self.reset()
+        self.lastError = ex
+
     @property
     def vocabulary(self)->dict:
         return self._core_vocabulary
 
     def nextWord(self)->str:
-        """return the next word from the commmand line buffer"""
-
-        while self.CliInDocQuote:
-            logging.debug("extracting docQuote ")
-            aString = self.get_input_till('"""')
-            if self.isCompiling:
-                self.compilingMethod.appendDocQuote(aString)
-            if self.CliIdx >= len(self.CLI):
-                self.CliInDocQuote = True
-                return None
-            else:
+        """return the next word from the commmand line buffer.
+        Doc quotes are added to the word being compiled and skipped.
+        Strings are returned including their quotes, numbers as numbers."""
+        while True:
+            if self.CliInDocQuote:
+                aString, found = self._input_till('"""')
+                if self.isCompiling:
+                    for line in aString.splitlines(keepends=True) or [aString]:
+                        self.compilingMethod.appendDocQuote(line)
+                if not found:
+                    return None  # the doc quote continues on the next line
                 self.CliInDocQuote = False
                 logging.debug("end docQuote ")
 
-        # return self.CLI.popleft()
-        # skip blanks
-        idx = self.CliIdx
-        while idx < len(self.CLI) and self.CLI[idx].isspace():
-            idx += 1
-        if idx >= len(self.CLI):
-            return None
-        # check if it's a doc string
-        if self.CLI[idx:].startswith('"""'):
-            logging.debug("start docQuote ")
-            self.CliIdx = idx + 3
-            self.CliInDocQuote = True
-            return self.nextWord()
-
-        # check if we have a quoted string
-        if self.CLI[idx] == '"':
-            quote = self.CLI[idx]
-            self.CliIdx = idx + 1
-            aString = '"' + self.get_input_till(quote) + '"'
-            return aString
-        else:  # start scanning the word
-            self.CliIdx = idx + 1
-            while self.CliIdx < len(self.CLI) and not self.CLI[self.CliIdx].isspace():
-                self.CliIdx += 1
-            # print ("idx:{}, cliIdx:{}".format(idx, self.CliIdx))
-            # print(self.CLI)
-            w = self.CLI[idx : self.CliIdx]
-
-            num = self.__parseNumber__(w)
-            if num is not None:
-                return num
-            else:
-                return w
+            # skip blanks
+            cli = self.CLI
+            match = _NON_BLANK.search(cli, self.CliIdx)
+            if match is None:
+                self.CliIdx = len(cli)
+                if self.refill():
+                    continue
+                return None
+            idx = match.start()
+            if cli[idx] == '"':
+                if len(cli) - idx < 3 and self.refill(idx):
+                    continue  # could be the start of a doc quote
+                # check if it's a doc string
+                if cli.startswith('"""', idx):
+                    logging.debug("start docQuote ")
+                    self.CliIdx = idx + 3
+                    self.CliInDocQuote = True
+                    continue
+                # a quoted string
+                self.CliIdx = idx + 1
+                return '"' + self.get_input_till('"') + '"'
+            end = _WORD.match(cli, idx).end()
+            if end < len(cli) or not self.refill(idx):
+                break  # else the word may continue in the next chunk
+
+        self.CliIdx = end
+        w = cli[idx : end]
+        num = self.__parseNumber__(w)
+        if num is not None:
+            return num
+        return w
 
     def __parseNumber__(self, w):
         """try to parse a number
         :param w: str
         :return: number
         """
-        # logging.debug("trying to parse a number from '{}'".format(w))
-        try:
-            if "." in w:
-                n = float(w)
-            else:
-                n = int(w)
-            logging.debug("number is {}".format(n))
-            return n
+        return parseNumber(w)
 
-        except ValueError:
-            # logging.debug("Not a number: '{}'".format(w))
-            return None
-
-    def reset(self):
+    def reset(self, soft:bool=False):
         """
-        reset the interpreter
+        reset the interpreter: clear the stacks and the input, stop compiling.
+        :param soft: empty the stacks in place instead of replacing them
         """
-        logging.info("reset")
-        print("Reset")
+        logging.debug("reset")
+        if soft:
+            self.stack.clear()
+            self.rp.clear()
+            self.callStack.clear()
+        else:
+            self.stack = []
+            self.rp = []
+            self.callStack = []
         self.CLI = ""
         self.CliIdx = 0
-        self.stack = []
-        self.rp = []
-        self.callStack = []
         self.isCompiling = False
         self.lastError = None
         self.CliInDocQuote = False
@@ -534,11 +1065,11 @@ class Interpreter(object):
         compile a constant primitive.
         :type constval: object
         """
-        logging.debug("compile constant '{}'".format(constval))
+        logging.debug("compile constant '%s'", constval)
         self.compilingMethod.code.append(CompiledConstant(constval))
 
     def compileMethod(self, method):
-        logging.debug("compiling method references {}".format(method))
+        logging.debug("compiling method references %s", method)
         self.compilingMethod.code.append(method)
 
     def compileWord(self, methodName):
@@ -551,9 +1082,38 @@ class Interpreter(object):
             )
 
     def readFrom(self, aStream):
-        """read forth from an iterable input"""
-        for line in aStream:
-            self.interpret(line)
+        """interpret forth read from a text stream or an iterable of lines.
+        The input is read in chunks, so only the unread part of the current
+        chunk is held in memory. Words, strings, doc quotes and definitions
+        may span chunks and lines."""
+        self.readChunks(_chunks(aStream))
+
+    def readChunks(self, chunks:Iterator[str]):
+        """interpret forth from an iterable of chunks of text.
+        Unlike the lines given to readFrom, the chunks are joined as they are,
+        so a word may continue in the next chunk."""
+        self.pushInput("", iter(chunks))
+        try:
+            self.__process_cli__()
+        finally:
+            self.popInput()
+            if not self.inputStack:
+                self.output.flush()
+
+    def loadFile(self, path:str, once:bool=False)->None:
+        """interpret a forth file, using the load cache if loadCache is set.
+        :param once: skip the file if it was loaded before
+        """
+        realPath = os.path.realpath(path)
+        if once and realPath in self.loadedFiles:
+            return
+        self.loadedFiles.add(realPath)
+        if self.loadCache is None:
+            with open(path, "r", encoding="utf-8") as fd:
+                self.readFrom(fd)
+            return
+        from pyforth.loadcache import LoadCache
+        LoadCache(self.loadCache).load(self, path)
 
     def startCompiling(self, methodName):
         logging.debug("Start Compiling")
@@ -563,13 +1123,29 @@ class Interpreter(object):
 
     def completeCompile(self)->None:
         """save the compiled body"""
-        logging.debug(
-            "completed compilation of word '{}'".format(self.compilingMethod.name)
-        )
+        logging.debug("completed compilation of word '%s'", self.compilingMethod.name)
+        from pyforth import optimizer
+        if self.optimize:
+            optimizer.optimize(self.compilingMethod)
+        else:
+            optimizer.resolveBranches(self.compilingMethod)
+        self.compilingMethod.thread()
+        if self.native:
+            self.compileNative(self.compilingMethod)
         voc = self.vocabularies[self.definitions]
         voc[self.compilingMethod.name] = self.compilingMethod
+        self.vocabularyChanged()
         self.isCompiling = False
 
+    def compileNative(self, method:CompiledCode)->bool:
+        """translate a compiled word into a python function.
+        Words that cannot be translated keep running interpreted.
+        :return: True if the word was translated
+        """
+        from pyforth import codegen
+        method.native = codegen.translate(method)
+        return method.native is not None
+
     # stack helpers
     def push(self, value: Any)->None:
         """
@@ -586,38 +1162,30 @@ class Interpreter(object):
 
 
     def fillMem(self, loc: int, nrItems: int, item: Any):
-        for addr in range(loc, loc+nrItems):
-            self.mem[addr] = item
+        self.mem.fill(loc, nrItems, item)
 
  
     def moveMem(self, origin: int, destination: int, nrItems: int):
         """move items , replace vacated locations with None"""
-        # check memory is long enough
-        # while len(self.mem) <= destination+nrItems:
-        #     self.mem.append(None)
-        # make a copy
-        cp = [self.mem[idx] for idx in range(origin, origin+nrItems)]
-        self.fillMem(origin, nrItems, None)
-        for idx, val in enumerate(cp):
-            self.mem[destination+idx]=val
+        self.mem.move(origin, destination, nrItems)
 
 
     def __postMortem__(self):
         """log a dump"""
         logging.error("Call callStack Dump:")
         for i in range(len(self.callStack)):
-            logging.error(f"{i}: {self.callStack[-i - 1]}")
+            logging.error("%s: %s", i, self.callStack[-i - 1])
             if i > 10:
                 break
  
         logging.error("Stack Dump:")
         for i in range(len(self.stack)):
-            logging.error("{}: {}".format(i, self.stack[-i - 1]))
+            logging.error("%s: %s", i, self.stack[-i - 1])
             if i > 10:
                 break
         logging.error("RP Dump:")
         for i in range(len(self.rp)):
-            logging.error("{}: {}".format(i, self.rp[-i - 1]))
+            logging.error("%s: %s", i, self.rp[-i - 1])
             if i > 10:
                 break
 
@@ -0,0 +1,221 @@
+"""
+=============
+PyForth Tasks
+=============
+Cooperative multitasking inside one interpreter.
+
+A Task runs a word with its own stack, return stack and call stack, sharing
+the vocabularies and the RAM of the interpreter. Tasks do not use python
+recursion for calling compiled words: the frames of a task are kept on its
+call stack and run a word at a time, so a task can be suspended anywhere
+and resumed later.
+
+The Scheduler of an interpreter runs its tasks round robin. A task runs until
+it executes PAUSE, waits in JOIN for a task that has not finished, or has
+executed `budget` words.
+
+    ' AGENT SPAWN      ( -- task )  start a task running AGENT
+    PAUSE              let the other tasks run
+    JOIN               ( task -- arr ) wait for a task, get what it left on its stack
+
+At the top level, outside any task, PAUSE runs every task for one round and
+JOIN runs the tasks until the task joined has finished.
+
+Words a task runs through EXECUTE or MAP are not suspended: inside them PAUSE
+does nothing and JOIN cannot wait.
+
+@author: stephanmeyn
+"""
+
+from __future__ import annotations
+
+import contextlib
+import logging
+from collections import deque
+from typing import TYPE_CHECKING, Coroutine
+
+from pyforth.exceptions import ExecutionError
+from pyforth.primitives import forthprim
+from pyforth.runtime import CallFrame, CompiledCode, CompiledConstant, CompiledPrimitive, vocabulary
+
+if TYPE_CHECKING:
+    from pyforth.runtime import Interpreter, MethodABC
+
+# pylint: disable="invalid-name"
+# pylint: disable="unused-argument"
+# pylint: disable="consider-using-f-string"
+
+TASK_BUDGET = 1000  # words a task runs before the next task gets its turn
+
+
+class Task():
+    """a word running with its own stacks"""
+
+    def __init__(self, engine:Interpreter, method:MethodABC, number:int):
+        self.engine = engine
+        self.method = method
+        self.number = number
+        self.stack:list = []
+        self.rp:list = []
+        self.frames:list[CallFrame] = []  # call stack of the task
+        self.started = False
+        self.done = False
+        self.error:Exception|None = None
+        # set by pyforth.aio: words with an async implementation suspend the task,
+        # which leaves the coroutine to await in awaiting
+        self.allowAwait = False
+        self.awaiting:Coroutine|None = None
+
+    def __str__(self):
+        state = "done" if self.done else "running"
+        return "Task {} {} ({})".format(self.number, self.method.name, state)
+
+    def _frame(self, method:CompiledCode, caller:CallFrame|None)->CallFrame:
+        frame = CallFrame(method)
+        frame.engine = self.engine
+        frame.caller = caller
+        frame.isCompiled = True
+        return frame
+
+    @contextlib.contextmanager
+    def installed(self):
+        """make the stacks of the task the stacks of the interpreter"""
+        engine = self.engine
+        saved = (engine.stack, engine.rp, engine.callStack, engine.currentTask)
+        engine.stack, engine.rp, engine.callStack = self.stack, self.rp, self.frames
+        engine.currentTask = self
+        try:
+            yield engine
+        finally:
+            self.stack, self.rp, self.frames = engine.stack, engine.rp, engine.callStack
+            engine.stack, engine.rp, engine.callStack, engine.currentTask = saved
+
+    def step(self, budget:int)->None:
+        """run at most budget words of the task"""
+        with self.installed() as engine:
+            try:
+                if not self.started:
+                    self.started = True
+                    if isinstance(self.method, CompiledCode):
+                        engine.callStack.append(self._frame(self.method, None))
+                    else:
+                        engine.execute(self.method, None)
+                self._run(engine, budget)
+            except Exception as ex:  # pylint: disable=broad-except
+                logging.info("task %s failed: %s", self.number, ex)
+                self.error = ex
+                self.done = True
+
+    def _run(self, engine:Interpreter, budget:int):
+        while budget > 0:
+            frames = engine.callStack
+            if not frames:
+                self.done = True
+                return
+            frame = frames[-1]
+            code = frame.method.code
+            if frame.xp >= len(code):
+                frames.pop()
+                continue
+            word = code[frame.xp]
+            frame.xp += 1
+            budget -= 1
+            wordType = type(word)
+            if wordType is CompiledPrimitive:
+                if word is _PAUSE:
+                    return
+                if word is _JOIN and not engine.stack[-1].done:
+                    frame.xp -= 1  # wait, JOIN again on the next turn
+                    return
+                if self.allowAwait and "async" in word.meta:
+                    self.awaiting = word.meta["async"](engine, frame)
+                    return
+                word.func(engine, frame)
+            elif wordType is CompiledConstant:
+                engine.stack.append(word.constantValue)
+            elif isinstance(word, CompiledCode):
+                frames.append(self._frame(word, frame))
+            else:
+                engine.execute(word, frame)
+
+
+class Scheduler():
+    """runs the tasks of an interpreter round robin"""
+
+    def __init__(self, engine:Interpreter, budget:int=TASK_BUDGET):
+        self.engine = engine
+        self.budget = budget
+        self.ready:deque[Task] = deque()
+        self.nrSpawned = 0
+
+    def __len__(self)->int:
+        """number of tasks not finished"""
+        return len(self.ready)
+
+    def spawn(self, method:MethodABC)->Task:
+        """start a task running method"""
+        self.nrSpawned += 1
+        task = Task(self.engine, method, self.nrSpawned)
+        self.ready.append(task)
+        return task
+
+    def runRound(self)->None:
+        """give each task one turn"""
+        for _ in range(len(self.ready)):
+            task = self.ready.popleft()
+            task.step(self.budget)
+            if not task.done:
+                self.ready.append(task)
+
+    def runUntil(self, task:Task)->None:
+        """run the tasks until task is done"""
+        while not task.done:
+            self.runRound()
+
+    def run(self)->None:
+        """run the tasks until all are done"""
+        while self.ready:
+            self.runRound()
+
+
+def scheduler(engine:Interpreter)->Scheduler:
+    """the scheduler of engine, created on first use"""
+    if engine.scheduler is None:
+        engine.scheduler = Scheduler(engine)
+    return engine.scheduler
+
+
+@forthprim("SPAWN")
+def spawn(engine, caller):
+    """start a task running forthWord with an empty stack
+    ( forthWord -> task )
+    """
+    engine.push(scheduler(engine).spawn(engine.pop()))
+
+
+@forthprim("PAUSE")
+def pause(engine, caller):
+    """let the other tasks run"""
+    if engine.currentTask is None:
+        scheduler(engine).runRound()
+
+
+@forthprim("JOIN")
+def join(engine, caller):
+    """wait for a task to finish, get the items left on its stack
+    ( task -> arr )
+    """
+    task = engine.stack[-1]
+    if not task.done:
+        if engine.currentTask is not None:
+            raise ExecutionError("JOIN", "cannot wait for a task inside a nested word")
+        scheduler(engine).runUntil(task)
+    engine.pop()
+    if task.error is not None:
+        raise ExecutionError(str(task), "task failed: {}".format(task.error))
+    engine.push(list(task.stack))
+
+
+# the stepping of a task treats these two words itself
+_PAUSE = vocabulary["PAUSE"]
+_JOIN = vocabulary["JOIN"]
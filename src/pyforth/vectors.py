@@ -0,0 +1,174 @@
+"""
+===============
+PyForth Vectors
+===============
+Words working on whole arrays at once, using numpy.
+
+The words accept numpy arrays and lists, and return numpy arrays.
+Scalars they return are python numbers.
+numpy is an optional dependency: without it the words raise an
+ExecutionError. It is imported by the first vector word run, so loading
+the words does not pay for it.
+
+MAP runs vectorized when it maps a numpy array with one of the core words in
+MAP_UNARY or MAP_REDUCE, see mapVectorized.
+
+@author: stephanmeyn
+"""
+
+from __future__ import annotations
+
+import sys
+
+from pyforth.exceptions import ExecutionError
+from pyforth.primitives import forthprim
+from pyforth.runtime import vocabulary
+
+# pylint: disable="invalid-name"
+# pylint: disable="unused-argument"
+
+# words mapping each item to one value: name -> function on the array
+MAP_UNARY = {
+    "ABS": lambda arr: abs(arr),
+    "MINUS": lambda arr: -arr,
+    "1+": lambda arr: arr + 1,
+    "2+": lambda arr: arr + 2,
+    "0=": lambda arr: arr == 0,
+    "0<": lambda arr: arr < 0,
+}
+
+# words combining each item with the value below: name -> (reduction, combination)
+MAP_REDUCE = {
+    "+": (lambda arr: arr.sum(), lambda a, b: a + b),
+    "*": (lambda arr: arr.prod(), lambda a, b: a * b),
+    "MIN": (lambda arr: arr.min(), min),
+    "MAX": (lambda arr: arr.max(), max),
+}
+
+
+def _numpy(word:str):
+    """import numpy on first use"""
+    try:
+        import numpy  # pylint: disable=import-outside-toplevel
+    except ImportError:  # pragma: no cover - depends on the installation
+        raise ExecutionError(word, "numpy is not installed") from None
+    return numpy
+
+
+def _scalar(value):
+    """a numpy scalar as python number"""
+    return value.item() if hasattr(value, "item") else value
+
+
+def isVector(value)->bool:
+    # without numpy imported there are no numpy arrays
+    np = sys.modules.get("numpy")
+    return np is not None and isinstance(value, np.ndarray)
+
+
+def mapVectorized(engine, method, arr)->bool:
+    """run MAP of method over arr as one numpy operation, if possible.
+    :return: False if MAP has to run method for each item"""
+    if not isVector(arr) or arr.ndim != 1 or vocabulary.get(method.name) is not method:
+        return False
+    if method.name in MAP_UNARY:
+        engine.stack.extend(MAP_UNARY[method.name](arr).tolist())
+        return True
+    if method.name in MAP_REDUCE and engine.stack:
+        if len(arr):
+            reduce, combine = MAP_REDUCE[method.name]
+            engine.stack[-1] = combine(engine.stack[-1], _scalar(reduce(arr)))
+        return True
+    return False
+
+
+@forthprim("V+")
+def vadd(engine, caller):
+    """element wise sum of two vectors, or of a vector and a number
+    ( v1 v2 -> v )
+    """
+    b = engine.pop()
+    a = engine.pop()
+    engine.push(_numpy("V+").add(a, b))
+
+
+@forthprim("V-")
+def vsub(engine, caller):
+    """element wise difference of two vectors, or of a vector and a number
+    ( v1 v2 -> v )
+    """
+    b = engine.pop()
+    a = engine.pop()
+    engine.push(_numpy("V-").subtract(a, b))
+
+
+@forthprim("V*")
+def vmul(engine, caller):
+    """element wise product of two vectors, or of a vector and a number
+    ( v1 v2 -> v )
+    """
+    b = engine.pop()
+    a = engine.pop()
+    engine.push(_numpy("V*").multiply(a, b))
+
+
+@forthprim("V/")
+def vdiv(engine, caller):
+    """element wise quotient of two vectors, or of a vector and a number
+    ( v1 v2 -> v )
+    """
+    b = engine.pop()
+    a = engine.pop()
+    engine.push(_numpy("V/").divide(a, b))
+
+
+@forthprim("VSUM")
+def vsum(engine, caller):
+    """sum of the items of a vector
+    ( v -> n )
+    """
+    engine.push(_scalar(_numpy("VSUM").sum(engine.pop())))
+
+
+@forthprim("VDOT")
+def vdot(engine, caller):
+    """dot product of two vectors
+    ( v1 v2 -> n )
+    """
+    b = engine.pop()
+    a = engine.pop()
+    engine.push(_scalar(_numpy("VDOT").dot(a, b)))
+
+
+@forthprim("VMIN")
+def vmin(engine, caller):
+    """smallest item of a vector
+    ( v -> n )
+    """
+    engine.push(_scalar(_numpy("VMIN").min(engine.pop())))
+
+
+@forthprim("VMAX")
+def vmax(engine, caller):
+    """largest item of a vector
+    ( v -> n )
+    """
+    engine.push(_scalar(_numpy("VMAX").max(engine.pop())))
+
+
+@forthprim("VSORT")
+def vsort(engine, caller):
+    """sorted copy of a vector
+    ( v -> v )
+    """
+    engine.push(_numpy("VSORT").sort(engine.pop()))
+
+
+@forthprim("VRANGE")
+def vrange(engine, caller):
+    """vector of the numbers from start up to, not including, stop
+    ( start stop -> v )
+    """
+    stop = engine.pop()
+    start = engine.pop()
+    engine.push(_numpy("VRANGE").arange(start, stop))
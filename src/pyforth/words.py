@@ -3,8 +3,10 @@ from __future__ import annotations
 # if TYPE_CHECKING:
 #     from pyforth.runtime import CallFrame
 import logging
+import time
 from pyforth.primitives import forthprim
 from pyforth.exceptions import WordNotFoundError, ExecutionError
+from pyforth import lazy, tasks, vectors  # noqa: F401
 
 #Flags for compilation
 BEGINFLAG = "BEGINFLAG"
@@ -23,7 +25,7 @@ def forth_print(engine, caller):
     sp = engine.stack
     top = sp[-1]
     sp.pop()
-    print(top)
+    engine.emit(top)
 
 
 @forthprim('(', isImmediate=True)
@@ -40,7 +42,7 @@ def dot_quote(engine, caller):
         engine.compileConstant(s)
         engine.compileWord(".")
     else:
-        print(s)
+        engine.emit(s)
 
 
 @forthprim("!")
@@ -61,7 +63,7 @@ def fill(engine, caller):
     ( addr u b ->)
     """
     addr, u, b = engine.pop(3)
-    engine.fillMem(addr, u, b)
+    engine.mem.fill(addr, u, b)
 
 
 @forthprim("MOVE")
@@ -70,7 +72,7 @@ def move(engine, caller):
     ( from to u->)
     """
     origin, dest, nrItems = engine.pop(3)
-    engine.moveMem(origin, dest, nrItems)
+    engine.mem.move(origin, dest, nrItems)
 
 
 @forthprim("ERASE")
@@ -79,7 +81,7 @@ def erase(engine, caller):
     ( addr   u->)
     """
     addr, nrItems = engine.pop(2)
-    engine.fillMem(addr, nrItems, None)
+    engine.mem.fill(addr, nrItems, None)
 
 @forthprim("BLANKS")
 def blanks(engine, caller):
@@ -87,7 +89,23 @@ def blanks(engine, caller):
     ( addr   u->)
     """
     addr, nrItems = engine.pop(2)
-    engine.fillMem(addr, nrItems, " ")
+    engine.mem.fill(addr, nrItems, " ")
+
+@forthprim("ALLOT-INTS")
+def allotInts(engine, caller):
+    """allocate a region of n integer cells, initialised to 0
+    ( n -> addr )
+    """
+    engine.push(engine.mem.allocate(engine.pop(), "q"))
+
+
+@forthprim("ALLOT-FLOATS")
+def allotFloats(engine, caller):
+    """allocate a region of n float cells, initialised to 0.0
+    ( n -> addr )
+    """
+    engine.push(engine.mem.allocate(engine.pop(), "d"))
+
 
 @forthprim("TOGGLE")
 def toggle(engine, caller):
@@ -249,7 +267,7 @@ def le(engine, caller):
 def question_mark(engine, caller):
     sp = engine.stack
     addr = sp.pop()
-    print(engine.mem[addr])
+    engine.emit(engine.mem[addr])
 
 
 @forthprim(":")
@@ -322,6 +340,52 @@ def forth_r(engine, caller):
     engine.push(engine.rp[-1])
 
 
+# fused words, compiled by the optimizer in place of common sequences
+
+@forthprim("(>R>R)")
+def toRtoR(engine, caller):
+    """same as >R >R
+    ( n1 n2 -> )"""
+    sp = engine.stack
+    rp = engine.rp
+    rp.append(sp.pop())
+    rp.append(sp.pop())
+
+
+@forthprim("UNLOOP")
+def unloop(engine, caller):
+    """discard the loop limit and index from the return stack,
+    same as R> R> DROP DROP"""
+    rp = engine.rp
+    rp.pop()
+    rp.pop()
+
+
+@forthprim("NIP")
+def nip(engine, caller):
+    """same as SWAP DROP
+    ( n1 n2 -> n2)"""
+    sp = engine.stack
+    n2 = sp.pop()
+    sp[-1] = n2
+
+
+@forthprim("(OVER+)")
+def overPlus(engine, caller):
+    """same as OVER +
+    ( n1 n2 -> n1 n2+n1)"""
+    sp = engine.stack
+    sp[-1] = sp[-1] + sp[-2]
+
+
+@forthprim("LIT+", executeOnly=True)
+def litPlus(engine, caller):
+    """add the constant following this word to TOS
+    ( n -> n+c)"""
+    sp = engine.stack
+    sp[-1] = sp[-1] + caller.operand()
+
+
 """looping"""
 
 
@@ -366,6 +430,16 @@ def forthRunTimeDo(engine, caller):
         engine.push(1)
 
 
+@forthprim("(DO)0BRANCH", executeOnly=True)
+def forthRunTimeDoBranch(engine, caller):
+    """same as (DO) 0BRANCH: skip the loop if the index reached the limit"""
+    rp = engine.rp
+    if rp[-1] >= rp[-2]:
+        caller.branch()
+    else:
+        caller.jumpRelative(1)  # jump over branch constant
+
+
 @forthprim("LOOP", isImmediate=True)
 def forthLoop(engine, caller):
     """compile a decrement i and jump to marker"""
@@ -545,11 +619,8 @@ def compileElse(engine, caller):
     branchDistance.constantValue = (
         len(engine.compilingMethod.code) - branchValueLocation
     )
-    logging.debug(
-        "Compiling ELSE: fixing up branch value at {} to {}".format(
-            branchValueLocation, branchDistance.constantValue
-        )
-    )
+    logging.debug("Compiling ELSE: fixing up branch value at %s to %s",
+                  branchValueLocation, branchDistance.constantValue)
     engine.push(addr)
     engine.push("DOIF")  # flag
 
@@ -567,11 +638,8 @@ def compileEndif(engine, caller):
     branchDistance.constantValue = (
         len(engine.compilingMethod.code) - branchValueLocation
     )  # relative jump
-    logging.debug(
-        "Compiling Endif: fixing up branch value at {} to {}".format(
-            branchValueLocation, branchDistance.constantValue
-        )
-    )
+    logging.debug("Compiling Endif: fixing up branch value at %s to %s",
+                  branchValueLocation, branchDistance.constantValue)
 
 @forthprim("[COMPILE]")
 def forthCompile(engine, caller):
@@ -611,6 +679,7 @@ def mk_vocabulary(engine, caller):
     engine.compileWord("(VOCABULARY)")
     engine.completeCompile()
     engine.definitions = voc_name
+    engine.vocabularyChanged()
 
 
 @forthprim("(VOCABULARY)")
@@ -619,6 +688,7 @@ def invoke_vocabulary(engine, caller):
     voc_name = engine.pop()
     assert voc_name in engine.vocabularies
     engine.context = voc_name
+    engine.vocabularyChanged()
     
 @forthprim("DEFINITIONS")
 def definitions_vocabulary(engine, caller):
@@ -626,20 +696,63 @@ def definitions_vocabulary(engine, caller):
     voc_name = engine.pop()
     assert voc_name in engine.vocabularies
     engine.definitions = voc_name
+    engine.vocabularyChanged()
 
 @forthprim("WORDS")
 def showWords(engine, caller):
-    global vocabulary
-    names = sorted(vocabulary.keys())
-    print(" ".join(names))
+    """print the words of the context vocabulary"""
+    names = sorted(engine.context_vocabulary.keys(), key=str)
+    engine.emit(" ".join(names))
+
+
+@forthprim("PROFILE-ON")
+def profileOn(engine, caller):
+    """start recording call counts and timings of words"""
+    engine.startProfiling()
+
+
+@forthprim("PROFILE-OFF")
+def profileOff(engine, caller):
+    """stop recording call counts and timings of words"""
+    engine.stopProfiling()
+
+
+@forthprim("PROFILE-REPORT")
+def profileReport(engine, caller):
+    """print the words with the highest exclusive time"""
+    if engine.profiler is None:
+        engine.emit("No profile recorded")
+    else:
+        engine.emit(engine.profiler.formatReport())
 
 
 @forthprim("EXPECT")
 def expect(engine, caller):
+    """read a line from the console
+    ( -> str )
+    """
+    engine.output.flush()  # show the prompt printed before
     txt = str(input(">"))
     engine.push(txt)
 
 
+@forthprim("MS")
+def sleepMs(engine, caller):
+    """wait for n milliseconds
+    ( n -> )
+    """
+    time.sleep(engine.pop() / 1000)
+
+
+@forthprim("READ-TEXT")
+def readText(engine, caller):
+    """read a text file
+    ( path -> str )
+    """
+    with open(engine.pop(), "r", encoding="utf-8") as fd:
+        engine.push(fd.read())
+
+
 @forthprim("SPLIT")
 def split(engine, caller):
     """s c ->array ...
@@ -652,8 +765,34 @@ def split(engine, caller):
 
 @forthprim("LOAD")
 def loadForth(engine, caller):
-    with open(engine.pop(), "r", encoding="utf-8") as fd:
-        engine.readFrom(fd)
+    """interpret a forth file
+    ( path -> )
+    """
+    engine.loadFile(engine.pop())
+
+
+@forthprim("REQUIRE")
+def requireForth(engine, caller):
+    """interpret a forth file unless it was loaded before
+    ( path -> )
+    """
+    engine.loadFile(engine.pop(), once=True)
+
+
+@forthprim("SAVE-IMAGE")
+def saveImage(engine, caller):
+    """write the compiled words, search order and RAM to an image file
+    ( path -> )
+    """
+    engine.saveImage(engine.pop())
+
+
+@forthprim("LOAD-IMAGE")
+def loadImage(engine, caller):
+    """restore the compiled words, search order and RAM from an image file
+    ( path -> )
+    """
+    engine.loadImage(engine.pop())
 
 
 @forthprim("FORMAT")
@@ -679,7 +818,7 @@ def tick(engine, caller):
     Used for EXECUTE and MAP etc"""
     nextWord = engine.nextWord()
     if nextWord:
-        method = engine.vocabulary.get(nextWord, None)
+        method = engine.find_word(nextWord)
         if method:
             engine.push(method)
         else:
@@ -698,27 +837,28 @@ def forthExecute(engine, caller):
 # Array stuff
 
 
+ARRAY_START = "LABEL["  # pushed by [
+
+
 @forthprim("[")
 def forthArrayStart(engine, caller):
-    """execute the method that is on TOS"""
-    engine.push("LABEL[")
+    """start an array"""
+    engine.push(ARRAY_START)
 
 
 @forthprim("]")
 def forthArrayEnd(engine, caller):
-    """execute the method that is on TOS"""
-    # found = False
+    """collect the items since the matching [ into an array"""
     result = []
     while len(engine.stack) > 0:
         item = engine.pop()
-        if item == "LABEL[":
-            break
+        # items may be vectors, which do not compare to a string as a bool
+        if type(item) is str and item == ARRAY_START:
+            result.reverse()
+            engine.push(result)
+            return
         result.append(item)
-    if item == "LABEL[":
-        result.reverse()
-        engine.push(result)
-    else:
-        raise ExecutionError("Array Expression", "Found ']' without matching '['")
+    raise ExecutionError("Array Expression", "Found ']' without matching '['")
 
 
 @forthprim("MAP")
@@ -727,15 +867,29 @@ def forthArrayMap(engine, caller):
     (arr forthWord -- )"""
     method = engine.pop()
     arr = engine.pop()
+    if vectors.mapVectorized(engine, method, arr):
+        return
     for item in arr:
         engine.push(item)
-        method.execute(engine, caller)
+        engine.execute(method, caller)
+
+
+@forthprim("PMAP")
+def forthArrayParallelMap(engine, caller):
+    """run a map on an array in worker processes.
+    Like MAP, but each item starts with an empty stack
+    (arr forthWord -- )"""
+    method = engine.pop()
+    arr = engine.pop()
+    engine.stack.extend(engine.pmap(method, arr))
 
 
 @forthprim("UNPACK")
 def forthArrayUnpack(engine, caller):
     """unpack an array"""
-    arr = engine.pop()
+    arr = lazy.force(engine.pop())
+    if vectors.isVector(arr):
+        arr = arr.tolist()
     for item in reversed(arr):
         engine.push(item)
 
@@ -754,7 +908,9 @@ def forthArray_pack(engine, caller):
 def forthLen(engine, caller):
     """determine the len attribute of the TOS
     ( n -- n len)
+    A lazy sequence is evaluated into an array
     """
+    engine.stack[-1] = lazy.force(engine.stack[-1])
     engine.push(len(engine.stack[-1]))
 
 @forthprim("MOD")
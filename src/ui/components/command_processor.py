@@ -3,9 +3,9 @@ from __future__ import annotations
 from dataclasses import KW_ONLY, field
 from turtle import textinput
 import typing as t
-from contextlib import redirect_stdout
 import io
 import rio
+from pyforth.output import OutputSink
 from pyforth.runtime import Interpreter, RAM
 from .. import components as comps
 
@@ -26,8 +26,8 @@ class CommandProcessor(rio.Component):
     def run_command(self):
         if self.command_text:
             f = io.StringIO()
-            with redirect_stdout(f):
-                self.engine.interpret(self.command_text)
+            self.engine.output = OutputSink(f)
+            self.engine.interpret(self.command_text)
             self.output_text = f.getvalue()
             self.engine_stack = self.engine.stack
 
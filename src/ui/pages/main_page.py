@@ -4,12 +4,17 @@ import typing as t
 from dataclasses import KW_ONLY, field
 
 import rio
+from pyforth.pool import InterpreterPool
 from pyforth.runtime import Interpreter, RAM
 from .. import components as comps
 
+# interpreters of the sessions, returned when a session closes its page
+ENGINES = InterpreterPool()
+
+
 @rio.page(url_segment="")
 class MainPage(rio.Component):
-    engine:Interpreter=Interpreter()
+    engine:Interpreter=field(default_factory=ENGINES.acquire)
     engine_stack:list[t.Any] = field(default_factory=list)
     # memory: t.Optional[RAM]=None
     
@@ -18,6 +23,10 @@ class MainPage(rio.Component):
     #     self.engine_stack = self.engine.stack
     #     self.memory = self.engine.mem
 
+    @rio.event.on_unmount
+    def release_engine(self) -> None:
+        ENGINES.release(self.engine)
+
     def build(self) -> rio.Component:
 
         grid=rio.Grid(grow_y=True)
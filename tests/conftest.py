@@ -0,0 +1,18 @@
+"""pytest configuration: select the execution mode of the interpreter"""
+
+from pyforth.runtime import Interpreter
+
+
+def pytest_addoption(parser):
+    parser.addoption("--threaded", action="store_true",
+                     help="run compiled words in their direct threaded form")
+    parser.addoption("--native", action="store_true",
+                     help="translate compiled words into python functions")
+    parser.addoption("--no-optimize", action="store_true",
+                     help="do not run the peephole optimizer over compiled words")
+
+
+def pytest_configure(config):
+    Interpreter.threaded = config.getoption("--threaded")
+    Interpreter.native = config.getoption("--native")
+    Interpreter.optimize = not config.getoption("--no-optimize")
@@ -0,0 +1,81 @@
+import asyncio
+import time
+
+from pyforth.aio import AsyncInterpreter
+
+
+def test_InterpretAsyncYields():
+    forth = AsyncInterpreter(budget=10)
+    ticks = []
+
+    async def ticker():
+        while True:
+            ticks.append(1)
+            await asyncio.sleep(0)
+
+    async def main():
+        background = asyncio.create_task(ticker())
+        await forth.interpret_async(": aio_loop 0 0 1000 DO 1+ LOOP ; 5 aio_loop")
+        background.cancel()
+
+    asyncio.run(main())
+    assert forth.engine.lastError is None
+    assert forth.engine.stack == [5, 1000]
+    # the loop ran some 3000 words, the event loop got a turn every 10
+    assert len(ticks) > 100
+
+
+def test_AsyncMs():
+    forth = AsyncInterpreter()
+    forth.engine.interpret(": aio_nap 1 50 MS 2 ;")
+
+    async def main():
+        start = time.monotonic()
+        other = asyncio.create_task(asyncio.sleep(0.05))
+        await asyncio.gather(forth.interpret_async("aio_nap 50 MS"), other)
+        return time.monotonic() - start
+
+    elapsed = asyncio.run(main())
+    assert forth.engine.stack == [1, 2]
+    assert elapsed < 0.5
+
+
+def test_AsyncExpect():
+    lines = iter(["first", "second"])
+
+    async def readLine(prompt):
+        await asyncio.sleep(0)
+        return next(lines)
+
+    forth = AsyncInterpreter(readLine=readLine)
+    asyncio.run(forth.interpret_async(": aio_ask EXPECT ; aio_ask EXPECT"))
+    assert forth.engine.stack == ["first", "second"]
+
+
+def test_AsyncReadTextAndLoad(tmp_path):
+    data = tmp_path / "data.txt"
+    data.write_text("hello")
+    source = tmp_path / "app.forth"
+    source.write_text(": aio_read READ-TEXT ;\n")
+    forth = AsyncInterpreter()
+
+    async def main():
+        await forth.load_async(str(source))
+        await forth.interpret_async('"{}" aio_read'.format(data))
+
+    asyncio.run(main())
+    assert forth.engine.stack == ["hello"]
+
+
+def test_AsyncErrorResets():
+    forth = AsyncInterpreter()
+    asyncio.run(forth.interpret_async(": aio_fail 1 0 / ; 1 2 aio_fail 3"))
+    assert isinstance(forth.engine.lastError, ZeroDivisionError)
+    assert forth.engine.stack == []
+
+
+def test_AsyncJoinRunsTasks():
+    forth = AsyncInterpreter()
+    forth.engine.interpret(": aio_task PAUSE PAUSE 7 ;")
+    asyncio.run(forth.interpret_async("' aio_task SPAWN JOIN"))
+    assert forth.engine.stack == [[7]]
@@ -0,0 +1,45 @@
+import pytest
+
+from pyforth.exceptions import ImageError
+from pyforth.runtime import CompiledCode, CompiledPrimitive, Interpreter
+import pyforth.words  # noqa: F401
+
+
+def test_SaveAndLoadImage(tmp_path):
+    path = str(tmp_path / "app.img")
+    interp = Interpreter()
+    interp.interpret("VOCABULARY IMG_VOC : img_sq DUP * ; : img_loop 0 0 5 DO I img_sq + LOOP ;")
+    interp.interpret("42 100 ! 3 ALLOT-INTS DUP 7 SWAP ! 200 !")
+    interp.interpret('"{}" SAVE-IMAGE'.format(path))
+    assert interp.lastError is None
+
+    restored = Interpreter.from_image(path, threaded=True)
+    voc = restored.vocabularies["IMG_VOC"]
+    assert set(voc) == {"img_sq", "img_loop"}
+    assert voc["img_loop"].threaded is not None
+    restored.interpret("IMG_VOC img_loop 100 @ 200 @ @")
+    assert restored.stack == [30, 42, 7]
+    assert type(restored.mem.pages[restored.mem.regions[0].base >> 10]) is memoryview
+
+
+def test_LoadImageWord(tmp_path):
+    path = str(tmp_path / "app.img")
+    interp = Interpreter()
+    interp.interpret(': img_word "hello" ;')
+    interp.saveImage(path)
+    other = Interpreter()
+    other.interpret('"{}" LOAD-IMAGE img_word'.format(path))
+    assert other.stack == ["hello"]
+
+
+def test_ImageRejectsUnknownPrimitive(tmp_path):
+    interp = Interpreter()
+    word = CompiledCode(name="img_bad")
+    word.code.append(CompiledPrimitive(lambda engine, caller: None, name="img_prim"))
+    interp.vocabularies["IMG_BAD"] = {"img_bad": word}
+    with pytest.raises(ImageError):
+        interp.saveImage(str(tmp_path / "bad.img"))
+    with open(tmp_path / "bad.img", "wb") as fd:
+        fd.write(b"not an image")
+    with pytest.raises(ImageError):
+        interp.loadImage(str(tmp_path / "bad.img"))
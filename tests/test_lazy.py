@@ -0,0 +1,26 @@
+from pyforth.lazy import LazySeq
+from pyforth.runtime import Interpreter
+import pyforth.words  # noqa: F401
+
+
+def test_Pipeline():
+    interp = Interpreter()
+    interp.interpret(": lz_sq DUP * ; : lz_odd 2 MOD ; 0 1000000000 RANGE ' lz_sq LMAP ' lz_odd FILTER 3 TAKE")
+    assert isinstance(interp.stack[-1], LazySeq)
+    interp.interpret("DUP COLLECT SWAP 0 ' + REDUCE")
+    assert interp.lastError is None
+    assert interp.stack == [[1, 9, 25], 35]
+
+
+def test_LenAndUnpackForce():
+    interp = Interpreter()
+    interp.interpret("1 4 RANGE LEN SWAP UNPACK")
+    assert interp.stack == [3, 3, 2, 1]
+
+
+def test_Lines(tmp_path):
+    path = tmp_path / "data.txt"
+    path.write_text("a\nbb\nccc\n", encoding="utf-8")
+    interp = Interpreter()
+    interp.interpret('"{}" LINES \' LEN LMAP COLLECT'.format(path))
+    assert interp.stack == [["a", 1, "bb", 2, "ccc", 3]]
@@ -0,0 +1,104 @@
+import io
+
+from pyforth.output import OutputSink
+from pyforth.runtime import Interpreter
+import pyforth.words  # noqa: F401
+
+
+def _write(path, text):
+    with open(path, "w", encoding="utf-8") as fd:
+        fd.write(text)
+    return str(path)
+
+
+def test_LoadCacheRestoresWords(tmp_path, monkeypatch):
+    monkeypatch.setattr(Interpreter, "loadCache", str(tmp_path / "cache"))
+    src = _write(tmp_path / "lib.forth", "VOCABULARY LC_VOC\n: lc_sq DUP * ;\n: lc_quad lc_sq lc_sq ;\n")
+    interp = Interpreter()
+    interp.interpret('"{}" LOAD 3 lc_quad'.format(src))
+    assert interp.stack == [81]
+    assert len(list((tmp_path / "cache").iterdir())) == 1
+
+    restored = Interpreter()
+    calls = []
+    monkeypatch.setattr(restored, "readChunks", calls.append)
+    restored.interpret('"{}" LOAD 2 LC_VOC lc_quad'.format(src))
+    assert calls == []
+    assert restored.stack == [16]
+    assert restored.definitions == "LC_VOC"
+    assert restored.vocabularies["LC_VOC"]["lc_quad"].threaded is not None
+
+
+def test_LoadCacheSkipsSideEffects(tmp_path, monkeypatch):
+    monkeypatch.setattr(Interpreter, "loadCache", str(tmp_path / "cache"))
+    src = _write(tmp_path / "effect.forth", ": lc_one 1 ;\nlc_one\n")
+    interp = Interpreter()
+    interp.interpret('"{}" LOAD'.format(src))
+    assert interp.stack == [1]
+    assert not (tmp_path / "cache").exists()
+
+
+def test_LoadCacheSkipsOutput(tmp_path, monkeypatch):
+    monkeypatch.setattr(Interpreter, "loadCache", str(tmp_path / "cache"))
+    src = _write(tmp_path / "noisy.forth", '." loading lib"\n: lc_two 2 ;\n')
+    out = io.StringIO()
+    interp = Interpreter(output=OutputSink(out))
+    interp.interpret('"{0}" LOAD "{0}" LOAD'.format(src))
+    assert out.getvalue() == "loading lib\nloading lib\n"
+    assert not (tmp_path / "cache").exists()
+
+
+def test_LoadCacheIgnoresEarlierError(tmp_path, monkeypatch):
+    monkeypatch.setattr(Interpreter, "loadCache", str(tmp_path / "cache"))
+    src = _write(tmp_path / "lib.forth", ": lc_three 3 ;\n")
+    interp = Interpreter()
+    interp.interpret("0 0 /")
+    error = interp.lastError
+    assert error is not None
+    interp.loadFile(src)
+    assert interp.lastError is error
+    assert len(list((tmp_path / "cache").iterdir())) == 1
+
+
+def test_LoadCacheRestoresLoadedFiles(tmp_path, monkeypatch):
+    monkeypatch.setattr(Interpreter, "loadCache", str(tmp_path / "cache"))
+    inner = _write(tmp_path / "inner.forth", ": lc_inner 2 ;\n")
+    outer = _write(tmp_path / "outer.forth", '"{}" REQUIRE\n: lc_outer lc_inner 1 + ;\n'.format(inner))
+    Interpreter().interpret('"{}" LOAD'.format(outer))
+
+    restored = Interpreter()
+    calls = []
+    monkeypatch.setattr(restored, "readChunks", calls.append)
+    restored.interpret('"{}" LOAD "{}" REQUIRE lc_outer'.format(outer, inner))
+    assert calls == []
+    assert restored.stack == [3]
+
+
+def test_Require(tmp_path):
+    src = _write(tmp_path / "once.forth", "1\n")
+    interp = Interpreter()
+    interp.interpret('"{0}" REQUIRE "{0}" REQUIRE'.format(src))
+    assert interp.stack == [1]
+    interp.interpret('"{0}" LOAD'.format(src))
+    assert interp.stack == [1, 1]
+
+
+def test_LoadCacheChecksNestedFiles(tmp_path, monkeypatch):
+    monkeypatch.setattr(Interpreter, "loadCache", str(tmp_path / "cache"))
+    inner = _write(tmp_path / "inner.fth", ": lc_val 1 ;\n")
+    outer = _write(tmp_path / "outer.fth", '"{}" LOAD\n: lc_outer lc_val 10 + ;\n'.format(inner))
+    interp = Interpreter()
+    interp.interpret('"{}" LOAD lc_outer'.format(outer))
+    assert interp.stack == [11]
+
+    _write(tmp_path / "inner.fth", ": lc_val 2 ;\n")
+    changed = Interpreter()
+    changed.interpret('"{}" LOAD lc_outer'.format(outer))
+    assert changed.stack == [12]
+
+    restored = Interpreter()
+    calls = []
+    monkeypatch.setattr(restored, "readChunks", calls.append)
+    restored.interpret('"{}" LOAD lc_outer'.format(outer))
+    assert calls == []
+    assert restored.stack == [12]
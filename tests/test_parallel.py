@@ -0,0 +1,51 @@
+from pyforth.runtime import Interpreter
+import pyforth.words  # noqa: F401
+
+
+def test_PmapInWorkers():
+    interp = Interpreter()
+    interp.interpret(": pm_sq DUP * 100 @ + ; 1 100 !")
+    try:
+        method = interp.find_word("pm_sq")
+        assert interp.pmap(method, list(range(10)), chunkSize=3, nrWorkers=2, minItems=0) \
+            == [n * n + 1 for n in range(10)]
+        assert interp.workers is not None
+    finally:
+        interp.stopWorkers()
+
+
+def test_PmapWordSerial():
+    interp = Interpreter()
+    interp.interpret(": pm_dup DUP ; 9 1 2 3 3 PACK ' pm_dup PMAP")
+    assert interp.lastError is None
+    assert interp.stack == [9, 1, 1, 2, 2, 3, 3]
+    assert interp.workers is None
+
+
+def test_PmapSeesRamWrittenBetweenCalls():
+    interp = Interpreter()
+    interp.interpret(": pm_addx 100 @ + ; 0 100 !")
+    try:
+        method = interp.find_word("pm_addx")
+        items = list(range(1, 7))
+        assert interp.pmap(method, items, nrWorkers=2, minItems=0) == items
+        workers = interp.workers
+        interp.interpret("50 100 !")
+        assert interp.pmap(method, items, nrWorkers=2, minItems=0) == [n + 50 for n in items]
+        assert interp.workers is workers
+        interp.interpret("7 100 !")
+        assert interp.pmap(method, items, chunkSize=1, nrWorkers=2, minItems=0) == [n + 7 for n in items]
+        assert interp.workers is workers
+    finally:
+        interp.stopWorkers()
+
+
+def test_PmapUndoesWorkerRamChanges():
+    interp = Interpreter()
+    interp.interpret(": pm_bump 100 @ + 1 100 +! ; 0 100 !")
+    try:
+        method = interp.find_word("pm_bump")
+        assert interp.pmap(method, [0] * 8, chunkSize=1, nrWorkers=2, minItems=0) == [0] * 8
+        assert interp.mem[100] == 0
+    finally:
+        interp.stopWorkers()
@@ -0,0 +1,53 @@
+import pytest
+
+from pyforth.pool import InterpreterPool
+import pyforth.words  # noqa: F401
+
+
+def _setup(engine):
+    engine.interpret(": pool_sq DUP * ; 7 100 !")
+
+
+def test_PoolRestoresSnapshot():
+    pool = InterpreterPool(_setup)
+    with pool.engine() as engine:
+        first = engine
+        engine.interpret("3 pool_sq 1 >R 9 100 ! 5 200 ! : pool_tmp 1 ; VOCABULARY POOL_VOC : pool_x 2 ; POOL_VOC")
+        assert engine.stack == [9]
+    assert len(pool) == 1
+    with pool.engine() as engine:
+        assert engine is first
+        assert engine.stack == [] and engine.rp == []
+        assert engine.mem[100] == 7 and engine.mem[200] is None
+        assert engine.find_word("pool_tmp") is None
+        assert "POOL_VOC" not in engine.vocabularies
+        assert engine.context == "FORTH" and engine.definitions == "FORTH"
+        engine.interpret("4 pool_sq")
+        assert engine.stack == [16]
+
+
+def test_PoolSizeAndEviction():
+    pool = InterpreterPool(maxSize=2, idleTimeout=None)
+    engines = [pool.acquire() for _ in range(3)]
+    assert len(set(map(id, engines))) == 3
+    for engine in engines:
+        pool.release(engine)
+    assert len(pool) == 2
+    pool.idleTimeout = 0
+    pool.evictIdle()
+    assert len(pool) == 0
+    with pytest.raises(ValueError):
+        pool.release(engines[0])
+
+
+def test_PoolRejectsDoubleRelease():
+    pool = InterpreterPool(idleTimeout=None)
+    engine = pool.acquire()
+    pool.release(engine)
+    with pytest.raises(ValueError):
+        pool.release(engine)
+    assert len(pool) == 1
+    first, second = pool.acquire(), pool.acquire()
+    assert first is not second
+    with pytest.raises(ValueError):
+        InterpreterPool().release(first)
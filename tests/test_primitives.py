@@ -2,6 +2,7 @@
 
 
 import logging
+from  pyforth.exceptions import ExecutionError
 from  pyforth.runtime import Interpreter, vocabulary
 import  pyforth.words
 # pylint: disable="missing-function-docstring"
@@ -431,6 +432,13 @@ def test_ArrayMap():
 
     assert len(interp.stack) == 0
 
+def test_ArrayMapColonDefinition():
+    interp = Interpreter()
+    interp.interpret(': test_dbl 2 * ;')
+    interp.interpret("[ 1 2 3 ] ' test_dbl MAP ")
+    assert interp.lastError is None
+    assert interp.stack == [2, 4, 6]
+
 def test_Len():
     interp = Interpreter()
 
@@ -659,3 +667,86 @@ def test_toggle():
     assert interp.mem[20] == 13
     
 
+
+
+def test_move_overlapping():
+    interp = Interpreter()
+    interp.interpret('10 4 "x" FILL  1 10 !  2 11 !  3 12 !  4 13 !')
+    interp.interpret('10 12 4 MOVE')
+    assert [interp.mem[addr] for addr in range(10, 16)] == [None, None, 1, 2, 3, 4]
+    interp.interpret('12 11 4 MOVE')
+    assert [interp.mem[addr] for addr in range(10, 16)] == [None, 1, 2, 3, 4, None]
+
+
+def test_fill_across_pages():
+    interp = Interpreter()
+    interp.interpret('1000 5000 7 FILL')
+    assert interp.mem[999] is None
+    assert interp.mem[1000] == 7
+    assert interp.mem[5999] == 7
+    assert interp.mem[6000] is None
+    interp.interpret('1000 5000 ERASE')
+    assert interp.mem[3000] is None
+
+
+def test_allot_ints():
+    interp = Interpreter()
+    interp.interpret('"obj" VARIABLE v  3000 ALLOT-INTS VARIABLE buf')
+    interp.interpret('buf @')
+    base = interp.stack.pop()
+    assert interp.mem[base] == 0
+    interp.interpret(f'5 {base} !  7 {base} +!  {base} @')
+    assert interp.stack == [12]
+    interp.interpret(f'{base} 1 + 2000 9 FILL  {base} 1 + @  {base} 2000 + @  {base} 2001 + @')
+    assert interp.stack[-3:] == [9, 9, 0]
+    interp.interpret(f'{base} 2999 + 1 ERASE  {base} 2999 + @')
+    assert interp.stack[-1] == 0
+    assert interp.mem[base + 3072] == base  # buf follows the pages of the region
+
+
+def test_allot_floats_move():
+    interp = Interpreter()
+    interp.interpret('1 100 !  2 101 !  4 ALLOT-FLOATS')
+    base = interp.stack.pop()
+    interp.interpret(f'100 {base} 3 MOVE')
+    assert interp.mem.read(base, 4) == [1.0, 2.0, 0.0, 0.0]
+    assert interp.mem[100] is None
+    interp.interpret(f'{base} 200 2 MOVE  200 @')
+    assert interp.stack == [1.0]
+
+def test_allot_ints_coerces():
+    interp = Interpreter()
+    interp.interpret('4 ALLOT-INTS')
+    base = interp.stack.pop()
+    interp.interpret(f'2.5 {base} !  {base} 1 + 2 7.9 FILL  100 {base} 3 + !  1.5 100 !  100 {base} 3 + 1 MOVE')
+    assert interp.lastError is None
+    assert interp.mem.read(base, 4) == [2, 7, 7, 1]
+
+
+def test_variables_follow_region():
+    interp = Interpreter()
+    interp.interpret('4 ALLOT-INTS DROP "hello" VARIABLE g 1.5 VARIABLE x g @ x @')
+    assert interp.lastError is None
+    assert interp.stack == ["hello", 1.5]
+
+
+def test_allot_ints_rejects_text():
+    interp = Interpreter()
+    interp.interpret('4 ALLOT-INTS DUP 2 BLANKS')
+    assert isinstance(interp.lastError, ExecutionError)
+    interp.interpret('4 ALLOT-INTS "x" SWAP !')
+    assert isinstance(interp.lastError, ExecutionError)
+
+
+def test_ArrayEndWithoutStart():
+    interp = Interpreter()
+    interp.interpret("1 2 ]")
+    assert isinstance(interp.lastError, ExecutionError)
+
+
+def test_ReadText(tmp_path):
+    path = tmp_path / "text.txt"
+    path.write_text("line one\nline two\n")
+    interp = Interpreter()
+    interp.interpret('"{}" READ-TEXT 0 MS'.format(path))
+    assert interp.stack == ["line one\nline two\n"]
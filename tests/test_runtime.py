@@ -0,0 +1,358 @@
+"""Test the runtime engine"""
+
+import io
+import logging
+
+
+from  pyforth.output import OutputSink
+from  pyforth.runtime import Interpreter, BranchTarget, CompiledPrimitive
+import  pyforth.words
+# pylint: disable="missing-function-docstring"
+# pylint: disable="invalid-name"
+
+
+def test_PrimitiveRunsInCallersFrame():
+    """primitives inside a colon definition do not get a frame of their own"""
+    seen = []
+
+    def probe(engine, caller):
+        seen.append((len(engine.callStack), caller.method.name, caller.isCompiled))
+
+    interp = Interpreter()
+    interp.vocabulary["PROBE"] = CompiledPrimitive(probe, name="PROBE")
+    interp.interpret(": test_ PROBE ; test_")
+    assert seen == [(1, "test_", True)]
+
+
+def test_ThreadedCode():
+    interp = Interpreter(threaded=True)
+    interp.interpret(': test_ 0 0 5 DO I + DUP 3 > IF LEAVE ENDIF LOOP "ok" ;')
+    code = interp.vocabulary["test_"]
+    assert len(code.threaded) == len(code.code)
+    interp.interpret("test_")
+    assert interp.lastError is None
+    assert interp.stack == [6, "ok"]
+    assert len(interp.rp) == 0
+
+
+def test_ThreadedSwitch():
+    interp = Interpreter(threaded=False)
+    interp.interpret(': test_ 3 BEGIN 1 - DUP 0 = UNTIL ;')
+    interp.interpret("test_")
+    interp.threaded = True
+    interp.interpret("test_")
+    assert interp.stack == [0, 0]
+
+
+def test_NativeCode():
+    interp = Interpreter(native=True)
+    interp.interpret(': inner_ 2 * ;')
+    interp.interpret(': test_ 0 0 6 DO I inner_ + DUP 12 > IF LEAVE ENDIF 2 +LOOP "ok" ;')
+    code = interp.vocabulary["test_"]
+    assert code.native is not None
+    assert "def forthWord" in code.meta["python"]
+    interp.interpret("test_")
+    assert interp.lastError is None
+    assert interp.stack == [12, "ok"]
+    assert len(interp.rp) == 0
+
+
+def test_NativeCodeBeginWhile():
+    interp = Interpreter(native=True)
+    interp.interpret(': test_ 7 BEGIN 1 - DUP WHILE DUP 10 * SWAP REPEAT "ok" ;')
+    interp.interpret("test_")
+    assert interp.stack == [60, 50, 40, 30, 20, 10, 0, "ok"]
+
+
+def test_NativeCodeFallback():
+    """words with unresolvable branches keep running interpreted"""
+    interp = Interpreter(native=True)
+    interp.interpret(': test_ 1 IF 5 ENDIF ;')
+    code = interp.vocabulary["test_"]
+    code.code[2].target = 99
+    assert not interp.compileNative(code)
+    assert code.native is None
+
+
+def test_OptimizerFusesLoop():
+    interp = Interpreter()
+    interp.optimize = True
+    interp.interpret(': test_ 0 0 5 DO OVER + SWAP SWAP 1 + LOOP ;')
+    code = interp.vocabulary["test_"]
+    names = [method.name for method in code.code]
+    assert "(>R>R)" in names
+    assert "(DO)0BRANCH" in names
+    assert "(OVER+)" in names
+    assert "LIT+" in names
+    assert "UNLOOP" in names
+    assert "SWAP" not in names
+    assert code.meta["eliminated"] == 9
+    interp.interpret("7 test_")
+    assert interp.stack == [7, 40]
+    assert len(interp.rp) == 0
+
+
+def test_OptimizerKeepsBranchTargets():
+    """no fusing across a branch target"""
+    interp = Interpreter()
+    interp.optimize = True
+    interp.interpret(': test_ IF SWAP ENDIF SWAP ;')
+    names = [method.name for method in interp.vocabulary["test_"].code]
+    assert names.count("SWAP") == 2
+    interp.interpret("1 2 0 test_")
+    assert interp.stack == [2, 1]
+    interp.interpret("1 test_")
+    assert interp.stack == [2, 1]
+
+
+def test_BranchTargetsAreAbsolute():
+    interp = Interpreter()
+    interp.optimize = False
+    interp.interpret(': test_ 0 0 3 DO I + LOOP ;')
+    code = interp.vocabulary["test_"].code
+    names = [method.name for method in code]
+    loop = names.index("(LOOP)")
+    assert isinstance(code[loop + 1], BranchTarget)
+    assert code[code[loop + 1].target].name == "(DO)"
+    zeroBranch = names.index("0BRANCH")
+    assert code[zeroBranch + 1].target == loop + 2
+    interp.interpret("test_")
+    assert interp.stack == [3]
+
+
+def test_TraceHook():
+    events = []
+    interp = Interpreter(threaded=True)
+    interp.interpret(': test_ 1 2 * ;')
+    interp.setTrace(events.append)
+    interp.interpret('test_')
+    interp.setTrace(None)
+    interp.interpret('test_')
+    assert interp.stack == [2, 2]
+    assert [(event.method.name, event.xp, event.depth) for event in events] == \
+        [("test_", 0, 0), ("test_", 1, 1), ("test_", 2, 2)]
+    assert events[-1].word.name == "*"
+
+
+def test_LoggingTrace(caplog):
+    interp = Interpreter()
+    interp.interpret(': test_ 1 DUP ;')
+    interp.setTrace()
+    with caplog.at_level(logging.DEBUG):
+        interp.interpret('test_')
+    assert "test_@1: DUP" in caplog.text
+
+
+def test_Profiler(tmp_path):
+    import pstats
+    interp = Interpreter()
+    interp.interpret(': inner_ 2 * ;')
+    interp.interpret(': test_ 0 0 4 DO I inner_ + LOOP ;')
+    interp.interpret('PROFILE-ON test_ PROFILE-OFF test_ PROFILE-REPORT')
+    assert interp.stack == [12, 12]
+    report = interp.profileReport()
+    assert report["test_"]["calls"] == 1
+    assert report["inner_"]["calls"] == 4
+    assert report["test_"]["inclusive"] >= report["inner_"]["inclusive"]
+    assert report["test_"]["exclusive"] <= report["test_"]["inclusive"]
+    body = [method.name for method in interp.vocabulary["test_"].code]
+    assert report["test_"]["xp"][body.index("inner_")] == 4
+    assert "test_;inner_ " in interp.profiler.collapsed()
+
+    path = tmp_path / "forth.prof"
+    interp.profiler.dumpStats(str(path))
+    stats = pstats.Stats(str(path))
+    assert stats.stats[("<forth>", 0, "inner_")][0] == 4
+
+
+def test_PagedRAM():
+    interp = Interpreter()
+    interp.interpret('1 1000000000 !  2 VARIABLE x  1000000000 @')
+    assert interp.stack == [1]
+    assert len(interp.mem.pages) == 1
+    assert interp.mem[999999999] is None
+    interp.interpret('x @')
+    assert interp.stack == [1, 2]
+    assert interp.mem[1000000001] == 2
+
+
+def test_RAMRanges():
+    interp = Interpreter()
+    mem = interp.mem
+    mem.write(1020, list(range(10)))
+    assert len(mem.pages) == 2
+    assert mem.read(1018, 14) == [None, None] + list(range(10)) + [None, None]
+    mem.write(5000, [None] * 3000)
+    assert len(mem.pages) == 2
+
+
+def test_Tokenizer():
+    interp = Interpreter()
+    interp.CLI = '  DUP 12 -3.5  "a  string" """ doc """ ( comment ) x"y  '
+    interp.CliIdx = 0
+    tokens = []
+    word = interp.nextWord()
+    while word is not None:
+        tokens.append(word)
+        word = interp.nextWord()
+    assert tokens == ["DUP", 12, -3.5, '"a  string"', "(", "comment", ")", 'x"y']
+    assert interp.CliIdx == len(interp.CLI)
+
+
+def test_TokenizerLongLine():
+    """tokenizing is linear in the line length"""
+    import time
+    interp = Interpreter()
+    line = " ".join(['1 DROP ( c ) "s" DROP'] * 20000)
+    start = time.perf_counter()
+    interp.interpret(line)
+    assert time.perf_counter() - start < 5
+    assert interp.lastError is None
+    assert interp.stack == []
+
+
+def test_NumberParsing():
+    interp = Interpreter()
+    assert interp.__parseNumber__("DUP") is None
+    assert interp.__parseNumber__("1+") is None
+    assert interp.__parseNumber__("-12") == -12
+    assert interp.__parseNumber__("1.5") == 1.5
+    interp.interpret("1 2 + 3 1+ 3 1+")
+    assert interp.stack == [3, 4, 4]
+
+
+def test_WordCacheFollowsRedefinition():
+    interp = Interpreter()
+    interp.interpret(": test_ 1 ; test_")
+    interp.interpret(": test_ 2 ; test_")
+    assert interp.stack == [1, 2]
+    interp.interpret("VOCABULARY VOC_A : test_ 3 ; VOC_A test_")
+    assert interp.stack == [1, 2, 3]
+
+
+def test_WordCacheIsPerInterpreter():
+    first = Interpreter()
+    second = Interpreter()
+    second.find_word("DUP")
+    cached = dict(second._wordCache)
+    first.interpret(": test_other 1 ;")
+    second.find_word("DUP")
+    assert second._wordCache == cached
+    assert second.find_word("test_other") is None
+
+
+def test_TickSearchesVocabularies():
+    interp = Interpreter()
+    interp.interpret("VOCABULARY VOC_B : test_b 5 ; VOC_B ' test_b EXECUTE")
+    assert interp.lastError is None
+    assert interp.stack == [5]
+    interp.interpret("' test_b")
+    assert interp.find_word("test_b") is interp.stack[-1]
+
+
+def test_ReadFromChunks():
+    """words, strings, doc quotes and definitions may span chunks"""
+    text = ': test_str\n  """ doc\n  more """\n  "a b" "c" + ;\ntest_str 100 ( done ) 1+'
+    for size in (1, 2, 3, 7):
+        interp = Interpreter()
+        interp.readChunks(text[pos: pos + size] for pos in range(0, len(text), size))
+        assert interp.lastError is None
+        assert interp.stack == ["a bc", 101]
+        assert [line.strip() for line in interp.vocabulary["test_str"].docstring] == ["doc", "more"]
+
+
+def test_ReadFromLines():
+    """items of an iterable are lines, with or without a newline"""
+    interp = Interpreter()
+    interp.readFrom(["1 2", "3\n", "4 DUP", "DROP"])
+    assert interp.lastError is None
+    assert interp.stack == [1, 2, 3, 4]
+    interp = Interpreter()
+    interp.readFrom(": test_lines\n DUP *\n ;\n5 test_lines".splitlines())
+    assert interp.stack == [25]
+
+
+def test_NestedLoadResumes(tmp_path):
+    inner = tmp_path / "inner.forth"
+    inner.write_text(": test_inner\n 2 ;\n", encoding="utf-8")
+    outer = tmp_path / "outer.forth"
+    outer.write_text('1 "{}" LOAD\ntest_inner 3\n'.format(inner), encoding="utf-8")
+    interp = Interpreter()
+    interp.interpret('"{}" LOAD 4'.format(outer))
+    assert interp.stack == [1, 2, 3, 4]
+    assert interp.inputStack == []
+
+
+def test_OutputSink():
+    out = io.StringIO()
+    interp = Interpreter(output=OutputSink(out))
+    interp.interpret('1 . ." hi" 2 3 + .')
+    assert out.getvalue() == "1\nhi\n5\n"
+    interp.interpret("NOT_A_WORD_")
+    assert out.getvalue().endswith("5\nWord 'NOT_A_WORD_' not found in vocabulary\n")
+
+
+def test_OutputSinkBuffering():
+    chunks = []
+    sink = OutputSink(chunks.append, bufferSize=10)
+    sink.print("abc")
+    assert chunks == [] and sink.pending() == "abc\n"
+    sink.print("defghij")
+    assert chunks == ["abc\ndefghij\n"]
+    lines = []
+    sink = OutputSink(lines.append, lineBuffered=True)
+    sink.write("a")
+    sink.write("b\n")
+    assert lines == ["ab\n"]
+
+
+def test_InterpretersDoNotShareDefinitions():
+    first = Interpreter()
+    second = Interpreter()
+    first.interpret(": test_own 1 ;")
+    assert "test_own" in first.vocabulary
+    assert "test_own" not in second.vocabulary
+    assert "test_own" not in pyforth.runtime.vocabulary
+    assert second.find_word("DUP") is first.find_word("DUP")
+
+
+def test_SoftReset():
+    interp = Interpreter()
+    stack = interp.stack
+    interp.interpret("1 2 3 >R")
+    interp.reset(soft=True)
+    assert interp.stack is stack and stack == [] and interp.rp == []
+    assert "mem" not in vars(interp)
+    interp.interpret("5 10 ! 10 @")
+    assert interp.stack == [5]
+
+
+def test_ExpectFlushesPrompt(monkeypatch):
+    out = io.StringIO()
+    interp = Interpreter(output=OutputSink(out))
+    seen = []
+
+    def fakeInput(prompt):
+        seen.append(out.getvalue())
+        return "Joe"
+    monkeypatch.setattr("builtins.input", fakeInput)
+    interp.interpret('." Name?" EXPECT')
+    assert seen == ["Name?\n"]
+    assert interp.stack == ["Joe"]
+
+
+def test_RunFlushesBeforeReading(monkeypatch):
+    out = io.StringIO()
+    interp = Interpreter(output=OutputSink(out))
+    lines = iter(['." hi"'])
+    seen = []
+
+    def fakeInput(prompt):
+        seen.append(out.getvalue())
+        return next(lines)
+    monkeypatch.setattr("builtins.input", fakeInput)
+    try:
+        interp.run()
+    except StopIteration:
+        pass
+    assert seen == ["", "hi\n"]
@@ -0,0 +1,41 @@
+from pyforth.runtime import Interpreter
+from pyforth.tasks import scheduler
+import pyforth.words  # noqa: F401
+
+
+def test_TasksInterleave():
+    interp = Interpreter()
+    interp.interpret(': tk_count 0 0 3 DO I 100 @ + 100 ! PAUSE 100 @ + LOOP ;')
+    interp.interpret("0 100 ! ' tk_count SPAWN ' tk_count SPAWN")
+    first, second = interp.stack
+    interp.interpret("JOIN SWAP JOIN")
+    assert interp.lastError is None
+    assert first.done and second.done
+    # both tasks share RAM 100, each keeps its own stack
+    assert interp.mem[100] == 6
+    assert interp.stack == [[1 + 4 + 6], [0 + 2 + 6]]
+
+
+def test_TaskBudget():
+    interp = Interpreter()
+    interp.interpret(": tk_loop 0 0 1000 DO 1+ LOOP ; ' tk_loop SPAWN")
+    sched = scheduler(interp)
+    sched.budget = 10
+    sched.runRound()
+    task = interp.stack[-1]
+    assert not task.done and interp.rp == []
+    interp.runTasks()
+    assert task.done and task.stack == [1000]
+
+
+def test_TaskJoinsTask():
+    interp = Interpreter()
+    interp.interpret(": tk_inner PAUSE PAUSE 7 ; ' tk_inner 200 ! : tk_outer 200 @ SPAWN JOIN 1 ; ' tk_outer SPAWN JOIN")
+    assert interp.lastError is None
+    assert interp.stack == [[[7], 1]]
+
+
+def test_TaskError():
+    interp = Interpreter()
+    interp.interpret(": tk_fail PAUSE DROP ; ' tk_fail SPAWN JOIN")
+    assert interp.lastError is not None
@@ -0,0 +1,51 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import pyforth
+from pyforth.runtime import Interpreter
+import pyforth.words  # noqa: F401
+
+np = pytest.importorskip("numpy")
+
+
+def test_VectorArithmetic():
+    interp = Interpreter()
+    interp.interpret("0 5 VRANGE DUP 2 V* V+ DUP VSUM SWAP DUP DUP VDOT SWAP DUP VMIN SWAP VMAX")
+    assert interp.lastError is None
+    assert interp.stack == [30, 270, 0, 12]
+    assert all(type(value) is int for value in interp.stack)
+
+
+def test_VectorsAsArrayItems():
+    interp = Interpreter()
+    interp.interpret("[ 1 3 VRANGE 5 ] LEN SWAP UNPACK")
+    assert interp.lastError is None
+    assert interp.stack[0] == 2
+    assert interp.stack[1] == 5
+    assert list(interp.stack[2]) == [1, 2]
+
+
+def test_VectorSortAndLists():
+    interp = Interpreter()
+    interp.interpret("[ 3 1 2 ] VSORT UNPACK [ 1 2 ] [ 3 4 ] V- VSUM")
+    assert interp.stack == [3, 2, 1, -4]
+
+
+def test_MapVectorized():
+    interp = Interpreter()
+    interp.interpret("-2 2 VRANGE ' ABS MAP 10 -2 3 VRANGE ' + MAP")
+    assert interp.stack == [2, 1, 0, 1, 10 + (-2 - 1 + 0 + 1 + 2)]
+    interp = Interpreter()
+    interp.interpret(": v_sq DUP * ; 1 4 VRANGE ' v_sq MAP")
+    assert interp.stack == [1, 4, 9]
+
+
+def test_WordsDoNotImportNumpy():
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(pyforth.__file__)))
+    result = subprocess.run(
+        [sys.executable, "-c", "import sys, pyforth.words; print('numpy' in sys.modules)"],
+        capture_output=True, text=True, env=env, check=True)
+    assert result.stdout.strip() == "False"